@@ -1,16 +1,50 @@
+import importlib
+from collections.abc import Mapping
+
 from .py.lora_manager import LoraManager
-from .py.nodes.lora_loader import LoraManagerLoader
-from .py.nodes.trigger_word_toggle import TriggerWordToggle
-from .py.nodes.lora_stacker import LoraStacker
-# from .py.nodes.save_image import SaveImage
-
-NODE_CLASS_MAPPINGS = {
-    LoraManagerLoader.NAME: LoraManagerLoader,
-    TriggerWordToggle.NAME: TriggerWordToggle,
-    LoraStacker.NAME: LoraStacker,
-    # SaveImage.NAME: SaveImage
+
+# Node classes are resolved lazily (PEP 562) so importing the plugin does not
+# drag in the node modules until ComfyUI actually introspects the mappings
+_LAZY_NODES = {
+    'LoraManagerLoader': ('.py.nodes.lora_loader', 'LoraManagerLoader'),
+    'TriggerWordToggle': ('.py.nodes.trigger_word_toggle', 'TriggerWordToggle'),
+    'LoraStacker': ('.py.nodes.lora_stacker', 'LoraStacker'),
+    # 'SaveImage': ('.py.nodes.save_image', 'SaveImage'),
+}
+
+# Node display names, mirroring each class's NAME attribute
+_NODE_NAMES = {
+    'Lora Loader (LoraManager)': 'LoraManagerLoader',
+    'TriggerWord Toggle (LoraManager)': 'TriggerWordToggle',
+    'Lora Stacker (LoraManager)': 'LoraStacker',
+    # 'Save Image (LoraManager)': 'SaveImage',
 }
 
+
+def __getattr__(name):
+    if name in _LAZY_NODES:
+        module_name, attr = _LAZY_NODES[name]
+        value = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazyNodeMappings(Mapping):
+    """Mapping that imports node classes on first access"""
+
+    def __getitem__(self, key):
+        return __getattr__(_NODE_NAMES[key])
+
+    def __iter__(self):
+        return iter(_NODE_NAMES)
+
+    def __len__(self):
+        return len(_NODE_NAMES)
+
+
+NODE_CLASS_MAPPINGS = _LazyNodeMappings()
+
 WEB_DIRECTORY = "./web/comfyui"
 
 # Register routes on import
@@ -1,5 +1,9 @@
 import asyncio
+import gzip
+import mimetypes
 import os
+from aiohttp import web
+from aiohttp.web_urldispatcher import StaticResource
 from server import PromptServer # type: ignore
 from .config import config
 from .routes.lora_routes import LoraRoutes
@@ -7,89 +11,268 @@ from .routes.api_routes import ApiRoutes
 from .routes.recipe_routes import RecipeRoutes
 from .routes.checkpoints_routes import CheckpointsRoutes
 from .services.lora_scanner import LoraScanner
-from .services.recipe_scanner import RecipeScanner
 from .services.file_monitor import LoraFileMonitor
 from .services.lora_cache import LoraCache
-from .services.recipe_cache import RecipeCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+class SendfileStaticResource(StaticResource):
+    """Static resource that serves files through the zero-copy sendfile(2) path
+
+    aiohttp's FileResponse already prefers loop.sendfile() when the transport
+    supports it, letting file bytes move kernel-to-socket without userspace
+    copies. This subclass pins a large chunk size for the fallback read/write
+    loop (used on loops without sendfile, e.g. uvloop) so preview images and
+    videos are streamed with far fewer syscalls and Python frames.
+    """
+
+    SENDFILE_CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, prefix: str, directory: str, **kwargs):
+        kwargs.setdefault('chunk_size', self.SENDFILE_CHUNK_SIZE)
+        super().__init__(prefix, directory, follow_symlinks=True, **kwargs)
+
+
 class LoraManager:
     """Main entry point for LoRA Manager plugin"""
-    
+
+    # root key ('root1', 'link_1', ...) -> (root, traversal-guard prefix),
+    # resolved once at route setup so requests only pay a dict lookup plus
+    # one startswith check
+    _preview_roots = {}
+
+    # LoraFileMonitor handle, filled by add_routes
+    _monitor = None
+
+    # Plugin asset root and traversal-guard prefix, filled by _setup
+    _static_root = None
+    _static_guard = None
+
+    @staticmethod
+    def _install_uvloop():
+        """Opt in to uvloop's io_uring-era event loop when available
+
+        Best effort: uvloop is not a hard dependency and ComfyUI may have
+        started its loop already, in which case the policy change only
+        affects loops created afterwards.
+        """
+        try:
+            import uvloop
+        except ImportError:
+            return
+        try:
+            if not isinstance(asyncio.get_event_loop_policy(), uvloop.EventLoopPolicy):
+                uvloop.install()
+                logger.info("LoRA Manager: uvloop event loop policy installed")
+        except Exception as e:
+            logger.debug(f"LoRA Manager: could not install uvloop: {e}")
+
     @classmethod
     def add_routes(cls):
-        """Initialize and register all routes"""
+        """Register routes at import time; defer the rest to app startup
+
+        aiohttp freezes the router before on_startup fires, so route
+        registration has to stay here. Everything that wants the serving
+        event loop or touches the filesystem happens in _setup instead.
+        """
+        cls._install_uvloop()
         app = PromptServer.instance.app
 
+        # Single indexed route covering every preview root
+        app.router.add_get('/loras_static/{root_key}/preview/{path:.*}', cls._handle_preview_request)
+
+        # Static route for plugin assets (gzip variants built during _setup)
+        app.router.add_get('/loras_static/{path:.*}', cls._handle_static_asset)
+
+        # One scanner, passed explicitly to every consumer
+        scanner = LoraScanner()
+
+        # Setup feature routes
+        routes = LoraRoutes(scanner)
+        checkpoints_routes = CheckpointsRoutes()
+
+        # Setup file monitoring (loop binding and start happen on startup).
+        # The handle lives on the class rather than the app dict so cleanup
+        # and other plugin code don't depend on aiohttp app-state keys.
+        monitor = LoraFileMonitor(scanner, config.loras_roots)
+        cls._monitor = monitor
+
+        routes.setup_routes(app)
+        checkpoints_routes.setup_routes(app)
+        ApiRoutes.setup_routes(app, monitor)
+        RecipeRoutes.setup_routes(app)
+
+        # Deferred setup once the serving loop exists
+        app.on_startup.append(cls._setup)
+
+        # Start the watchdog observer in a worker thread so scheduling the
+        # watches (which stats every root) never blocks the event loop
+        app.on_startup.append(lambda app: cls._start_monitor(monitor))
+
+        # Schedule cache initialization using the application's startup
+        # handler. Recipe cache init lives in RecipeRoutes._init_cache,
+        # which warm-starts from the persisted snapshot; scheduling a
+        # second init here would clobber that warm cache with an empty one
+        app.on_startup.append(lambda app: cls._schedule_cache_init(scanner))
+
+        # Add cleanup
+        app.on_shutdown.append(cls._cleanup)
+        app.on_shutdown.append(ApiRoutes.cleanup)
+
+    @classmethod
+    async def _setup(cls, app):
+        """Deferred initialization running in the serving event loop"""
+        if cls._monitor is not None:
+            cls._monitor.bind_loop(asyncio.get_running_loop())
+
+        cls._resolve_preview_roots()
+
+        # Pre-gzip plugin assets off the loop; text assets then skip
+        # per-request compression entirely
+        await asyncio.get_running_loop().run_in_executor(None, cls._precompress_static_assets)
+        cls._static_root = config.static_path.replace(os.sep, '/')
+        cls._static_guard = cls._static_root.rstrip('/') + '/'
+
+    @classmethod
+    def _resolve_preview_roots(cls):
+        """Map preview root keys to filesystem roots and record route mappings"""
         added_targets = set()  # 用于跟踪已添加的目标路径
-        
-        # Add static routes for each lora root
+
+        # Each lora root lives under a shared preview dispatcher so URL
+        # matching stays O(1) no matter how many roots are configured
         for idx, root in enumerate(config.loras_roots, start=1):
             preview_path = f'/loras_static/root{idx}/preview'
-            
+
             real_root = root
             if root in config._path_mappings.values():
                 for target, link in config._path_mappings.items():
                     if link == root:
                         real_root = target
                         break
-            # 为原始路径添加静态路由
-            app.router.add_static(preview_path, real_root)
+            cls._preview_roots[f'root{idx}'] = (real_root, real_root.rstrip('/') + '/')
             logger.info(f"Added static route {preview_path} -> {real_root}")
-            
+
             # 记录路由映射
             config.add_route_mapping(real_root, preview_path)
             added_targets.add(real_root)
-        
+
         # 为符号链接的目标路径添加额外的静态路由
         link_idx = 1
-        
+
         for target_path, link_path in config._path_mappings.items():
             if target_path not in added_targets:
                 route_path = f'/loras_static/link_{link_idx}/preview'
-                app.router.add_static(route_path, target_path)
+                cls._preview_roots[f'link_{link_idx}'] = (target_path, target_path.rstrip('/') + '/')
                 logger.info(f"Added static route for link target {route_path} -> {target_path}")
                 config.add_route_mapping(target_path, route_path)
                 added_targets.add(target_path)
                 link_idx += 1
-        
-        # Add static route for plugin assets
-        app.router.add_static('/loras_static', config.static_path)
-        
-        # Setup feature routes
-        routes = LoraRoutes()
-        checkpoints_routes = CheckpointsRoutes()
-        
-        # Setup file monitoring
-        monitor = LoraFileMonitor(routes.scanner, config.loras_roots)
-        monitor.start()
-        
-        routes.setup_routes(app)
-        checkpoints_routes.setup_routes(app)
-        ApiRoutes.setup_routes(app, monitor)
-        RecipeRoutes.setup_routes(app)
-        
-        # Store monitor in app for cleanup
-        app['lora_monitor'] = monitor
-        
-        # Schedule cache initialization using the application's startup handler
-        app.on_startup.append(lambda app: cls._schedule_cache_init(routes.scanner, routes.recipe_scanner))
-        
-        # Add cleanup
-        app.on_shutdown.append(cls._cleanup)
-        app.on_shutdown.append(ApiRoutes.cleanup)
-    
+
+    @classmethod
+    async def _handle_preview_request(cls, request):
+        """Serve a preview file from the root selected by {root_key}"""
+        root_info = cls._preview_roots.get(request.match_info['root_key'])
+        if root_info is None:
+            raise web.HTTPNotFound()
+
+        root, guard_prefix = root_info
+        file_path = os.path.normpath(os.path.join(root, request.match_info['path'])).replace(os.sep, '/')
+        # 防止路径穿越
+        if not file_path.startswith(guard_prefix):
+            raise web.HTTPForbidden()
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            raise web.HTTPNotFound()
+
+        # Strong validator from size+mtime; repeat fetches of an unchanged
+        # preview collapse to a 0-byte 304
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        cache_headers = {'ETag': etag, 'Cache-Control': 'public, max-age=604800'}
+
+        if etag in request.headers.get('If-None-Match', ''):
+            return web.Response(status=304, headers=cache_headers)
+        if_modified_since = request.if_modified_since
+        if if_modified_since and int(st.st_mtime) <= if_modified_since.timestamp():
+            return web.Response(status=304, headers=cache_headers)
+
+        # Let the transport buffer up to 4 MiB before applying backpressure
+        # so the 256 KiB chunks coalesce into few large send() calls
+        if request.transport is not None:
+            try:
+                request.transport.set_write_buffer_limits(high=4 * 1024 * 1024)
+            except (AttributeError, NotImplementedError):
+                pass
+
+        # FileResponse handles Range requests for resumable large previews
+        return web.FileResponse(
+            file_path,
+            chunk_size=SendfileStaticResource.SENDFILE_CHUNK_SIZE,
+            headers=cache_headers
+        )
+
+    # 可压缩的静态资源后缀
+    COMPRESSIBLE_SUFFIXES = ('.js', '.css', '.html', '.svg')
+
+    @classmethod
+    def _precompress_static_assets(cls):
+        """Create .gz siblings for text assets so responses skip per-request compression"""
+        try:
+            for dirpath, _, filenames in os.walk(config.static_path):
+                for name in filenames:
+                    if not name.endswith(cls.COMPRESSIBLE_SUFFIXES):
+                        continue
+                    src = os.path.join(dirpath, name)
+                    gz = src + '.gz'
+                    try:
+                        if os.path.exists(gz) and os.path.getmtime(gz) >= os.path.getmtime(src):
+                            continue
+                        with open(src, 'rb') as f:
+                            data = f.read()
+                        with open(gz, 'wb') as f:
+                            f.write(gzip.compress(data, 9))
+                    except Exception as e:
+                        logger.error(f"Error pre-compressing {src}: {e}")
+        except Exception as e:
+            logger.error(f"Error pre-compressing static assets: {e}")
+
+    @classmethod
+    async def _handle_static_asset(cls, request):
+        """Serve a plugin asset, preferring a pre-gzipped variant when accepted"""
+        file_path = os.path.normpath(os.path.join(cls._static_root, request.match_info['path'])).replace(os.sep, '/')
+        # 防止路径穿越
+        if not file_path.startswith(cls._static_guard):
+            raise web.HTTPForbidden()
+        if not os.path.isfile(file_path):
+            raise web.HTTPNotFound()
+
+        if file_path.endswith(cls.COMPRESSIBLE_SUFFIXES) and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            gz_path = file_path + '.gz'
+            if os.path.isfile(gz_path):
+                content_type = mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
+                return web.FileResponse(gz_path, headers={
+                    'Content-Encoding': 'gzip',
+                    'Content-Type': content_type,
+                    'Vary': 'Accept-Encoding'
+                })
+
+        return web.FileResponse(file_path, chunk_size=SendfileStaticResource.SENDFILE_CHUNK_SIZE)
+
     @classmethod
-    async def _schedule_cache_init(cls, scanner: LoraScanner, recipe_scanner: RecipeScanner):
+    async def _start_monitor(cls, monitor: LoraFileMonitor):
+        """Start file monitoring in a background thread"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, monitor.start)
+        except Exception as e:
+            logger.error(f"LoRA Manager: Error starting file monitor: {e}")
+
+    @classmethod
+    async def _schedule_cache_init(cls, scanner: LoraScanner):
         """Schedule cache initialization in the running event loop"""
         try:
             # 创建低优先级的初始化任务
             lora_task = asyncio.create_task(cls._initialize_lora_cache(scanner), name='lora_cache_init')
-            
-            # Schedule recipe cache initialization with a delay to let lora scanner initialize first
-            recipe_task = asyncio.create_task(cls._initialize_recipe_cache(recipe_scanner, delay=2), name='recipe_cache_init')
         except Exception as e:
             logger.error(f"LoRA Manager: Error scheduling cache initialization: {e}")
     
@@ -109,28 +292,12 @@ class LoraManager:
             await scanner.get_cached_data(force_refresh=True)
         except Exception as e:
             logger.error(f"LoRA Manager: Error initializing lora cache: {e}")
-    
-    @classmethod
-    async def _initialize_recipe_cache(cls, scanner: RecipeScanner, delay: float = 2.0):
-        """Initialize recipe cache in background with a delay"""
-        try:
-            # Wait for the specified delay to let lora scanner initialize first
-            await asyncio.sleep(delay)
-            
-            # Set initial empty cache
-            scanner._cache = RecipeCache(
-                raw_data=[],
-                sorted_by_name=[],
-                sorted_by_date=[]
-            )
-            
-            # Force refresh to load the actual data
-            await scanner.get_cached_data(force_refresh=True)
-        except Exception as e:
-            logger.error(f"LoRA Manager: Error initializing recipe cache: {e}")
-    
+
     @classmethod
     async def _cleanup(cls, app):
-        """Cleanup resources"""
-        if 'lora_monitor' in app:
-            app['lora_monitor'].stop()
+        """Cleanup resources, overlapping shutdown work instead of serializing it"""
+        cleanups = []
+        if cls._monitor is not None:
+            cleanups.append(cls._monitor.astop())
+        if cleanups:
+            await asyncio.gather(*cleanups, return_exceptions=True)
@@ -517,8 +517,6 @@ class ApiRoutes:
         except Exception as e:
             logger.error(f"Error fetching CivitAI data: {e}")
             return False
-        finally:
-            await client.close()
 
     async def get_lora_roots(self, request: web.Request) -> web.Response:
         """Get all configured LoRA root directories"""
@@ -11,16 +11,30 @@ from ..services.settings_manager import settings  # Add this import
 logger = logging.getLogger(__name__)
 logging.getLogger('asyncio').setLevel(logging.CRITICAL)
 
+# CivitAI fields kept in API/template payloads; frozenset membership is
+# checked once per key in the filter below
+_CIVITAI_FIELDS = frozenset({
+    "id", "modelId", "name", "createdAt", "updatedAt",
+    "publishedAt", "trainedWords", "baseModel", "description",
+    "model", "images"
+})
+
 class LoraRoutes:
     """Route handlers for LoRA management endpoints"""
     
-    def __init__(self):
-        self.scanner = LoraScanner()
+    def __init__(self, scanner: LoraScanner = None):
+        # Accept an injected scanner so every consumer provably shares the
+        # same instance instead of relying on singleton construction
+        self.scanner = scanner if scanner is not None else LoraScanner()
         self.recipe_scanner = RecipeScanner(self.scanner)
+        # Templates never change at runtime, so skip the per-request
+        # staleness stat and resolve the hot-path template once up front
         self.template_env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(config.templates_path),
-            autoescape=True
+            autoescape=True,
+            auto_reload=False
         )
+        self._loras_template = self.template_env.get_template('loras.html')
 
     def format_lora_data(self, lora: Dict) -> Dict:
         """Format LoRA data for template rendering"""
@@ -32,7 +46,9 @@ class LoraRoutes:
             "base_model": lora["base_model"],
             "folder": lora["folder"],
             "sha256": lora["sha256"],
-            "file_path": lora["file_path"].replace(os.sep, "/"),
+            # Paths are normalized to forward slashes at ingest time
+            # (normalize_path in file_utils), so no per-render fixup needed
+            "file_path": lora["file_path"],
             "size": lora["size"],
             "tags": lora["tags"],
             "modelDescription": lora["modelDescription"],
@@ -47,13 +63,8 @@ class LoraRoutes:
         """Filter relevant fields from CivitAI data"""
         if not data:
             return {}
-            
-        fields = [
-            "id", "modelId", "name", "createdAt", "updatedAt", 
-            "publishedAt", "trainedWords", "baseModel", "description",
-            "model", "images"
-        ]
-        return {k: data[k] for k in fields if k in data}
+
+        return {k: v for k, v in data.items() if k in _CIVITAI_FIELDS}
 
     async def handle_loras_page(self, request: web.Request) -> web.Response:
         """Handle GET /loras request"""
@@ -67,46 +78,47 @@ class LoraRoutes:
                  self.scanner._initialization_task is not None)
             )
 
+            # 默认渲染初始化页面；正常流程下再填入缓存数据
+            context = {
+                'folders': [],  # 空文件夹列表
+                'is_initializing': True,
+                'settings': settings,  # Pass settings to template
+                'request': request  # Pass the request object to the template
+            }
+
             if is_initializing:
-                # 如果正在初始化，返回一个只包含加载提示的页面
-                template = self.template_env.get_template('loras.html')
-                rendered = template.render(
-                    folders=[],  # 空文件夹列表
-                    is_initializing=True,  # 新增标志
-                    settings=settings,  # Pass settings to template
-                    request=request  # Pass the request object to the template
-                )
-                
                 logger.info("Loras page is initializing, returning loading page")
             else:
                 # 正常流程 - 但不要等待缓存刷新
                 try:
                     cache = await self.scanner.get_cached_data(force_refresh=False)
-                    template = self.template_env.get_template('loras.html')
-                    rendered = template.render(
-                        folders=cache.folders,
-                        is_initializing=False,
-                        settings=settings,  # Pass settings to template
-                        request=request  # Pass the request object to the template
-                    )
+                    context['folders'] = cache.folders
+                    context['is_initializing'] = False
                     logger.info(f"Loras page loaded successfully with {len(cache.raw_data)} items")
                 except Exception as cache_error:
-                    logger.error(f"Error loading cache data: {cache_error}")
                     # 如果获取缓存失败，也显示初始化页面
-                    template = self.template_env.get_template('loras.html')
-                    rendered = template.render(
-                        folders=[],
-                        is_initializing=True,
-                        settings=settings,
-                        request=request
-                    )
+                    logger.error(f"Error loading cache data: {cache_error}")
                     logger.info("Cache error, returning initialization page")
-            
-            return web.Response(
-                text=rendered,
-                content_type='text/html'
+
+            # Stream the render instead of materializing the full page:
+            # chunks go out as Jinja2 yields them, so there is no
+            # whole-page buffer and the first byte leaves before the
+            # folder list has finished rendering
+            template = self._loras_template
+            response = web.StreamResponse(
+                headers={'Content-Type': 'text/html; charset=utf-8'}
             )
-            
+            await response.prepare(request)
+            try:
+                for chunk in template.generate(**context):
+                    await response.write(chunk.encode('utf-8'))
+            except Exception as stream_error:
+                # Headers are already sent; all we can do is log and end
+                # the (truncated) stream
+                logger.error(f"Error streaming loras page: {stream_error}", exc_info=True)
+            await response.write_eof()
+            return response
+
         except Exception as e:
             logger.error(f"Error handling loras request: {e}", exc_info=True)
             return web.Response(
@@ -1,4 +1,7 @@
+import io
+import base64
 import os
+import re
 import time
 import logging
 from aiohttp import web
@@ -6,6 +9,11 @@ from typing import Dict
 import tempfile
 import json
 import asyncio
+import heapq
+import uuid
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from ..utils.exif_utils import ExifUtils
 from ..utils.recipe_parsers import RecipeParserFactory
 from ..services.civitai_client import CivitaiClient
@@ -14,21 +22,150 @@ from ..services.recipe_scanner import RecipeScanner
 from ..services.lora_scanner import LoraScanner
 from ..config import config
 from ..workflow.parser import WorkflowParser
-from ..utils.utils import download_civitai_image
+from ..utils.utils import download_civitai_image_async
+from ..utils.json_utils import json_loads, json_response, read_json_file, write_json_file
+import aiohttp
 
 logger = logging.getLogger(__name__)
 
+# Fallback preview shown when a recipe has no image
+_NO_PREVIEW_URL = '/loras_static/images/no-preview.png'
+
+# Matches "<lora:name:strength>" entries in a workflow lora stack
+_LORA_RE = re.compile(r'<lora:([^:]+):([^>]+)>')
+
+# Ceiling for uploaded workflow JSON so a huge field can't buffer unbounded
+_MAX_WORKFLOW_JSON_SIZE = 4 * 1024 * 1024
+
+# Image suffixes accepted when picking up the latest generated image
+_IMAGE_EXTS = frozenset({'png', 'jpg', 'jpeg', 'webp'})
+
+
+def _slugify(title: str) -> str:
+    """Build a filesystem/header-safe slug from a recipe title"""
+    return re.sub(r'[^a-z0-9]+', '_', (title or '').lower()).strip('_')[:64]
+
+
+def _lora_stem(name: str) -> str:
+    """Strip any directory prefix and extension from a lora reference
+
+    Pure string slicing; cheaper than basename + splitext and handles
+    both path separators regardless of platform.
+    """
+    stem = name.replace('\\', '/').rpartition('/')[2]
+    return stem.rpartition('.')[0] or stem
+
 class RecipeRoutes:
     """API route handlers for Recipe management"""
 
+    # Process pool for Pillow/WebP work, shared across handler instances so
+    # image encodes run on other cores instead of holding the GIL
+    _img_pool = None
+
     def __init__(self):
         self.recipe_scanner = RecipeScanner(LoraScanner())
         self.civitai_client = CivitaiClient()
         self.parser = WorkflowParser()
-        
+
         # Pre-warm the cache
         self._init_cache_task = None
 
+        # Bound concurrent disk work offloaded from the event loop
+        self._disk_semaphore = asyncio.Semaphore(8)
+
+        # Bound concurrent metadata parses so burst traffic can't fan out
+        # unlimited Civitai lookups at once
+        self._parse_sem = asyncio.Semaphore(16)
+
+        # Shared HTTP session for image downloads, created lazily so the
+        # serving loop owns it
+        self._http_session = None
+
+        # Constants for the per-item URL formatter, computed once
+        self._loras_root0 = config.loras_roots[0].replace(os.sep, '/') if config.loras_roots else ''
+        self._recipes_dir_prefix = f"{self._loras_root0}/recipes"
+
+        # Shared recipe downloads awaiting pickup, pruned by a background
+        # task; the heap orders entries by expiry so GC only touches the
+        # entries that are actually due
+        self._shared_recipes = {}
+        self._shared_expiry_heap = []
+        self._shared_gc_task = None
+
+    def _get_http_session(self) -> 'aiohttp.ClientSession':
+        """Get the shared pooled HTTP session, creating it on first use"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+            )
+        return self._http_session
+
+    async def _close_http_session(self, app):
+        """Close the shared HTTP session on shutdown"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+
+    async def _close_civitai_client(self, app):
+        """Close the shared Civitai client pool on shutdown"""
+        await self.civitai_client.close()
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run blocking disk I/O in a thread without starving the event loop"""
+        async with self._disk_semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    @classmethod
+    def _get_img_pool(cls) -> ProcessPoolExecutor:
+        if cls._img_pool is None:
+            cls._img_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return cls._img_pool
+
+    async def _run_cpu(self, func, *args):
+        """Run CPU-bound image work in the process pool
+
+        Falls back to a thread if the pool can't be used (e.g. the worker
+        can't re-import this module under spawn).
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_img_pool(), func, *args)
+        except BrokenProcessPool:
+            logger.warning("Image process pool unavailable, falling back to a thread")
+            return await asyncio.to_thread(func, *args)
+
+    async def _shutdown_img_pool(self, app):
+        """Tear down the image process pool on shutdown"""
+        if type(self)._img_pool is not None:
+            type(self)._img_pool.shutdown(wait=False)
+            type(self)._img_pool = None
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _unlink_quiet(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing shared recipe file {path}: {e}")
+
+    @staticmethod
+    def _write_json(path: str, data: Dict):
+        write_json_file(path, data)
+
+    @staticmethod
+    def _read_json(path: str) -> Dict:
+        return read_json_file(path)
+
     @classmethod
     def setup_routes(cls, app: web.Application):
         """Register API routes"""
@@ -49,27 +186,115 @@ class RecipeRoutes:
         
         # Start cache initialization
         app.on_startup.append(routes._init_cache)
+        app.on_shutdown.append(routes._close_http_session)
+        app.on_shutdown.append(routes._close_civitai_client)
+        app.on_shutdown.append(routes._shutdown_img_pool)
+        app.on_shutdown.append(routes._cancel_shared_gc)
+        app.on_shutdown.append(routes._save_cache_snapshot)
         
         app.router.add_post('/api/recipes/save-from-widget', routes.save_recipe_from_widget)
+
+        # Serve analyzed images by URL instead of embedding base64 payloads
+        app.router.add_get('/api/recipe/tmp/{tmp_id}', routes.get_tmp_image)
     
     async def _init_cache(self, app):
         """Initialize cache on startup"""
+        try:
+            # Serve from the persisted snapshot immediately when available;
+            # the full rescan then runs in the background
+            if await self.recipe_scanner.load_cache_snapshot():
+                asyncio.create_task(self._refresh_cache())
+            else:
+                await self._refresh_cache()
+        except Exception as e:
+            logger.error(f"Error pre-warming recipe cache: {e}", exc_info=True)
+
+        # Prune expired shared recipes in the background instead of on every share
+        if self._shared_gc_task is None:
+            self._shared_gc_task = asyncio.create_task(self._shared_recipe_gc())
+
+    async def _refresh_cache(self):
+        """Run the full recipe rescan after the lora scanner is warm"""
         try:
             # First, ensure the lora scanner is fully initialized
             lora_scanner = self.recipe_scanner._lora_scanner
-            
+
             # Get lora cache to ensure it's initialized
             lora_cache = await lora_scanner.get_cached_data()
-            
+
             # Verify hash index is built
             if hasattr(lora_scanner, '_hash_index'):
                 hash_index_size = len(lora_scanner._hash_index._hash_to_path) if hasattr(lora_scanner._hash_index, '_hash_to_path') else 0
-            
+
             # Now that lora scanner is initialized, initialize recipe cache
             await self.recipe_scanner.get_cached_data(force_refresh=True)
         except Exception as e:
-            logger.error(f"Error pre-warming recipe cache: {e}", exc_info=True)
-    
+            logger.error(f"Error refreshing recipe cache: {e}", exc_info=True)
+
+    async def _save_cache_snapshot(self, app):
+        """Persist the recipe cache at shutdown for fast warm starts"""
+        await self.recipe_scanner.save_cache_snapshot()
+
+    async def _shared_recipe_gc(self):
+        """Periodically drop expired shared recipes and their temp files"""
+        while True:
+            await asyncio.sleep(60)
+            try:
+                now = time.time()
+                # Pop only entries that are actually due instead of walking
+                # the whole dict every cycle
+                while self._shared_expiry_heap and self._shared_expiry_heap[0][0] <= now:
+                    expires, rid = heapq.heappop(self._shared_expiry_heap)
+                    entry = self._shared_recipes.get(rid)
+                    if entry is None or entry.get('expires') != expires:
+                        continue  # superseded by a newer registration
+                    del self._shared_recipes[rid]
+                    # readonly entries point at library files, never delete those
+                    if entry.get('readonly'):
+                        continue
+                    # Unlink directly instead of stat-then-unlink; a missing
+                    # file just means it was already cleaned up
+                    await asyncio.to_thread(self._unlink_quiet, entry['path'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error cleaning up shared recipes: {e}")
+
+    async def _cancel_shared_gc(self, app):
+        """Stop the shared-recipe GC task on shutdown"""
+        if self._shared_gc_task is not None:
+            self._shared_gc_task.cancel()
+            self._shared_gc_task = None
+
+    def _register_tmp_image(self, result: Dict, temp_path: str, is_url_mode: bool) -> str:
+        """Expose a downloaded image via a short-lived URL instead of base64
+
+        Registers the temp file under a one-time id served by get_tmp_image;
+        the shared-recipe GC removes it once expired. Returns the new
+        temp_path for the caller (None when ownership moved to the GC).
+        """
+        if not (is_url_mode and temp_path):
+            return temp_path
+
+        tmp_id = uuid.uuid4().hex
+        expires = time.time() + 300  # 5 minutes to finish the import flow
+        self._shared_recipes[tmp_id] = {
+            'path': temp_path,
+            'created': time.time(),
+            'expires': expires
+        }
+        heapq.heappush(self._shared_expiry_heap, (expires, tmp_id))
+        result['image_url'] = f'/api/recipe/tmp/{tmp_id}'
+        return None
+
+    async def get_tmp_image(self, request: web.Request) -> web.Response:
+        """Serve an analyzed image registered by _register_tmp_image"""
+        tmp_id = request.match_info['tmp_id']
+        entry = self._shared_recipes.get(tmp_id)
+        if entry is None or not os.path.exists(entry['path']):
+            return json_response({"error": "Image not found or expired"}, status=404)
+        return web.FileResponse(entry['path'])
+
     async def get_recipes(self, request: web.Request) -> web.Response:
         """API endpoint for getting paginated recipes"""
         try:
@@ -104,6 +329,17 @@ class RecipeRoutes:
                 'lora_model': search_lora_model
             }
 
+            # Short-circuit unchanged polls with a weak ETag keyed on the
+            # cache version plus the query shape
+            etag = None
+            cache = self.recipe_scanner._cache
+            if cache is not None:
+                query_key = hash((search, base_models, tags, search_title,
+                                  search_tags, search_lora_name, search_lora_model))
+                etag = f'W/"{cache._version}-{page}-{page_size}-{sort_by}-{query_key}"'
+                if request.headers.get('If-None-Match') == etag:
+                    return web.Response(status=304, headers={'ETag': etag})
+
             # Get paginated data
             result = await self.recipe_scanner.get_paginated_data(
                 page=page,
@@ -115,25 +351,19 @@ class RecipeRoutes:
             )
             
             # Format the response data with static URLs for file paths
+            format_url = self._format_recipe_file_url
             for item in result['items']:
                 # Always ensure file_url is set
-                if 'file_path' in item:
-                    item['file_url'] = self._format_recipe_file_url(item['file_path'])
-                else:
-                    item['file_url'] = '/loras_static/images/no-preview.png'
-                
-                # 确保 loras 数组存在
-                if 'loras' not in item:
-                    item['loras'] = []
-                    
-                # 确保有 base_model 字段
-                if 'base_model' not in item:
-                    item['base_model'] = ""
+                file_path = item.get('file_path')
+                item['file_url'] = format_url(file_path) if file_path else _NO_PREVIEW_URL
+                # 确保 loras 数组和 base_model 字段存在
+                item.setdefault('loras', [])
+                item.setdefault('base_model', "")
             
-            return web.json_response(result)
+            return json_response(result, headers={'ETag': etag} if etag else None)
         except Exception as e:
             logger.error(f"Error retrieving recipes: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
 
     async def get_recipe_detail(self, request: web.Request) -> web.Response:
         """Get detailed information about a specific recipe"""
@@ -144,30 +374,35 @@ class RecipeRoutes:
             cache = await self.recipe_scanner.get_cached_data()
             
             # Find the specific recipe
-            recipe = next((r for r in cache.raw_data if str(r.get('id', '')) == recipe_id), None)
-            
+            recipe = cache.get_recipe_by_id(recipe_id)
+
             if not recipe:
-                return web.json_response({"error": "Recipe not found"}, status=404)
-            
+                return json_response({"error": "Recipe not found"}, status=404)
+
             # Format recipe data
             formatted_recipe = self._format_recipe_data(recipe)
             
-            return web.json_response(formatted_recipe)
+            return json_response(formatted_recipe)
         except Exception as e:
             logger.error(f"Error retrieving recipe details: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
     
-    def _format_recipe_file_url(self, file_path: str) -> str:
-        """Format file path for recipe image as a URL"""
+    def _format_recipe_file_url(self, file_path: str, _sep=os.sep, _basename=os.path.basename) -> str:
+        """Format file path for recipe image as a URL
+
+        Runs once per listed item, so os attributes are bound as default
+        args to skip the repeated module lookups.
+        """
         try:
-            # Return the file URL directly for the first lora root's preview
-            recipes_dir = os.path.join(config.loras_roots[0], "recipes").replace(os.sep, '/')
-            if file_path.replace(os.sep, '/').startswith(recipes_dir):
-                relative_path = os.path.relpath(file_path, config.loras_roots[0]).replace(os.sep, '/')
-                return f"/loras_static/root1/preview/{relative_path}" 
-            
+            # Return the file URL directly for the first lora root's preview,
+            # slicing off the cached root prefix instead of calling relpath
+            fp = file_path.replace(_sep, '/')
+            if fp.startswith(self._recipes_dir_prefix):
+                relative_path = fp[len(self._loras_root0) + 1:]
+                return f"/loras_static/root1/preview/{relative_path}"
+
             # If not in recipes dir, try to create a valid URL from the file path
-            file_name = os.path.basename(file_path)
+            file_name = _basename(file_path)
             return f"/loras_static/root1/preview/recipes/{file_name}"
         except Exception as e:
             logger.error(f"Error formatting recipe file URL: {e}", exc_info=True)
@@ -188,10 +423,9 @@ class RecipeRoutes:
         
         return formatted
     
-    def _format_timestamp(self, timestamp: float) -> str:
+    def _format_timestamp(self, timestamp: float, _fromtimestamp=datetime.fromtimestamp) -> str:
         """Format timestamp for display"""
-        from datetime import datetime
-        return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') 
+        return _fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
 
     async def analyze_recipe_image(self, request: web.Request) -> web.Response:
         """Analyze an uploaded image or URL for recipe metadata"""
@@ -208,18 +442,19 @@ class RecipeRoutes:
                 field = await reader.next()
                 
                 if field.name != 'image':
-                    return web.json_response({
+                    return json_response({
                         "error": "No image field found",
                         "loras": []
                     }, status=400)
                 
-                # Create a temporary file to store the uploaded image
+                # Create a temporary file to store the uploaded image,
+                # writing chunks in a thread so slow disks don't stall the loop
                 with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
                     while True:
                         chunk = await field.read_chunk()
                         if not chunk:
                             break
-                        temp_file.write(chunk)
+                        await asyncio.to_thread(temp_file.write, chunk)
                     temp_path = temp_file.name
                     
             elif 'application/json' in content_type:
@@ -229,22 +464,23 @@ class RecipeRoutes:
                 is_url_mode = True
                 
                 if not url:
-                    return web.json_response({
+                    return json_response({
                         "error": "No URL provided",
                         "loras": []
                     }, status=400)
                 
                 # Download image from URL
-                temp_path = download_civitai_image(url)
-                
+                temp_path = await download_civitai_image_async(url, self._get_http_session())
+
                 if not temp_path:
-                    return web.json_response({
+                    return json_response({
                         "error": "Failed to download image from URL",
                         "loras": []
                     }, status=400)
             
-            # Extract metadata from the image using ExifUtils
-            metadata = ExifUtils.extract_image_metadata(temp_path)
+            # Extract metadata from the image using ExifUtils (Pillow work
+            # runs in the process pool)
+            metadata = await self._run_cpu(ExifUtils.extract_image_metadata, temp_path)
             
             # If no metadata found, return a more specific error
             if not metadata:
@@ -252,14 +488,11 @@ class RecipeRoutes:
                     "error": "No metadata found in this image",
                     "loras": []  # Return empty loras array to prevent client-side errors
                 }
-                
-                # For URL mode, include the image data as base64
-                if is_url_mode and temp_path:
-                    import base64
-                    with open(temp_path, "rb") as image_file:
-                        result["image_base64"] = base64.b64encode(image_file.read()).decode('utf-8')
-                    
-                return web.json_response(result, status=200)
+
+                # For URL mode, hand back a short-lived URL for the image
+                temp_path = self._register_tmp_image(result, temp_path, is_url_mode)
+
+                return json_response(result, status=200)
             
             # Use the parser factory to get the appropriate parser
             parser = RecipeParserFactory.create_parser(metadata)
@@ -269,37 +502,32 @@ class RecipeRoutes:
                     "error": "No parser found for this image",
                     "loras": []  # Return empty loras array to prevent client-side errors
                 }
-                
-                # For URL mode, include the image data as base64
-                if is_url_mode and temp_path:
-                    import base64
-                    with open(temp_path, "rb") as image_file:
-                        result["image_base64"] = base64.b64encode(image_file.read()).decode('utf-8')
-                    
-                return web.json_response(result, status=200)
-            
-            # Parse the metadata
-            result = await parser.parse_metadata(
-                metadata, 
-                recipe_scanner=self.recipe_scanner, 
-                civitai_client=self.civitai_client
-            )
-            
-            # For URL mode, include the image data as base64
-            if is_url_mode and temp_path:
-                import base64
-                with open(temp_path, "rb") as image_file:
-                    result["image_base64"] = base64.b64encode(image_file.read()).decode('utf-8')
-            
+
+                # For URL mode, hand back a short-lived URL for the image
+                temp_path = self._register_tmp_image(result, temp_path, is_url_mode)
+
+                return json_response(result, status=200)
+            
+            # Parse the metadata under the concurrency cap
+            async with self._parse_sem:
+                result = await parser.parse_metadata(
+                    metadata,
+                    recipe_scanner=self.recipe_scanner,
+                    civitai_client=self.civitai_client
+                )
+            
+            # For URL mode, hand back a short-lived URL for the image
+            temp_path = self._register_tmp_image(result, temp_path, is_url_mode)
+
             # Check for errors
             if "error" in result and not result.get("loras"):
-                return web.json_response(result, status=200)
+                return json_response(result, status=200)
             
-            return web.json_response(result)
+            return json_response(result)
             
         except Exception as e:
             logger.error(f"Error analyzing recipe image: {e}", exc_info=True)
-            return web.json_response({
+            return json_response({
                 "error": str(e),
                 "loras": []  # Return empty loras array to prevent client-side errors
             }, status=500)
@@ -331,15 +559,16 @@ class RecipeRoutes:
                     break
                 
                 if field.name == 'image':
-                    # Read image data
-                    image_data = b''
+                    # Stream image data into a buffer; repeated bytes
+                    # concatenation is quadratic on large uploads
+                    buf = io.BytesIO()
                     while True:
                         chunk = await field.read_chunk()
                         if not chunk:
                             break
-                        image_data += chunk
-                    image = image_data
-                    
+                        buf.write(chunk)
+                    image = buf.getvalue()
+
                 elif field.name == 'image_base64':
                     # Get base64 image data
                     image_base64 = await field.text()
@@ -354,14 +583,14 @@ class RecipeRoutes:
                 elif field.name == 'tags':
                     tags_text = await field.text()
                     try:
-                        tags = json.loads(tags_text)
+                        tags = json_loads(tags_text)
                     except:
                         tags = []
                     
                 elif field.name == 'metadata':
                     metadata_text = await field.text()
                     try:
-                        metadata = json.loads(metadata_text)
+                        metadata = json_loads(metadata_text)
                     except:
                         metadata = {}
             
@@ -371,61 +600,61 @@ class RecipeRoutes:
             if not metadata:
                 missing_fields.append("metadata")
             if missing_fields:
-                return web.json_response({"error": f"Missing required fields: {', '.join(missing_fields)}"}, status=400)
+                return json_response({"error": f"Missing required fields: {', '.join(missing_fields)}"}, status=400)
             
             # Handle different image sources
             if not image:
                 if image_base64:
                     # Convert base64 to binary
-                    import base64
                     try:
                         # Remove potential data URL prefix
                         if ',' in image_base64:
                             image_base64 = image_base64.split(',', 1)[1]
                         image = base64.b64decode(image_base64)
                     except Exception as e:
-                        return web.json_response({"error": f"Invalid base64 image data: {str(e)}"}, status=400)
+                        return json_response({"error": f"Invalid base64 image data: {str(e)}"}, status=400)
                 elif image_url:
-                    # Download image from URL
-                    temp_path = download_civitai_image(image_url)
-                    if not temp_path:
-                        return web.json_response({"error": "Failed to download image from URL"}, status=400)
-                    
-                    # Read the downloaded image
-                    with open(temp_path, 'rb') as f:
-                        image = f.read()
-                    
-                    # Clean up temp file
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
+                    if image_url.startswith('/api/recipe/tmp/'):
+                        # Reuse the image already downloaded during analysis
+                        tmp_id = image_url.rsplit('/', 1)[1]
+                        entry = self._shared_recipes.get(tmp_id)
+                        if entry is None or not os.path.exists(entry['path']):
+                            return json_response({"error": "Analyzed image expired, please re-analyze"}, status=400)
+                        image = await self._run_blocking(self._read_file, entry['path'])
+                    else:
+                        # Download image from URL
+                        temp_path = await download_civitai_image_async(image_url, self._get_http_session())
+                        if not temp_path:
+                            return json_response({"error": "Failed to download image from URL"}, status=400)
+
+                        # Read the downloaded image
+                        image = await self._run_blocking(self._read_file, temp_path)
+
+                        # Clean up temp file
+                        try:
+                            os.unlink(temp_path)
+                        except:
+                            pass
                 else:
-                    return web.json_response({"error": "No image data provided"}, status=400)
+                    return json_response({"error": "No image data provided"}, status=400)
             
             # Create recipes directory if it doesn't exist
             recipes_dir = self.recipe_scanner.recipes_dir
-            os.makedirs(recipes_dir, exist_ok=True)
-            
+            await self._run_blocking(os.makedirs, recipes_dir, exist_ok=True)
+
             # Generate UUID for the recipe
-            import uuid
-            recipe_id = str(uuid.uuid4())
-            
-            # Optimize the image (resize and convert to WebP)
-            optimized_image, extension = ExifUtils.optimize_image(
-                image_data=image,
-                target_width=480,
-                format='webp',
-                quality=85,
-                preserve_metadata=True
+            recipe_id = uuid.uuid4().hex
+
+            # Optimize the image (resize and convert to WebP) on another core
+            optimized_image, extension = await self._run_cpu(
+                ExifUtils.optimize_image, image, 480, 'webp', 85, True
             )
-            
+
             # Save the optimized image
             image_filename = f"{recipe_id}{extension}"
             image_path = os.path.join(recipes_dir, image_filename)
-            with open(image_path, 'wb') as f:
-                f.write(optimized_image)
-            
+            await self._run_blocking(self._write_file, image_path, optimized_image)
+
             # Create the recipe JSON
             current_time = time.time()
             
@@ -470,6 +699,7 @@ class RecipeRoutes:
                 "id": recipe_id,
                 "file_path": image_path,
                 "title": name,
+                "slug": _slugify(name),
                 "modified": current_time,
                 "created_date": current_time,
                 "base_model": metadata.get("base_model", ""),
@@ -484,24 +714,18 @@ class RecipeRoutes:
             # Save the recipe JSON
             json_filename = f"{recipe_id}.recipe.json"
             json_path = os.path.join(recipes_dir, json_filename)
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(recipe_data, f, indent=4, ensure_ascii=False)
+            await self._run_blocking(self._write_json, json_path, recipe_data)
 
             # Add recipe metadata to the image
-            ExifUtils.append_recipe_metadata(image_path, recipe_data)
-            
-            # Simplified cache update approach
-            # Instead of trying to update the cache directly, just set it to None
-            # to force a refresh on the next get_cached_data call
+            await self._run_cpu(ExifUtils.append_recipe_metadata, image_path, recipe_data)
+
+            # Update cache
             if self.recipe_scanner._cache is not None:
-                # Add the recipe to the raw data if the cache exists
-                # This is a simple direct update without locks or timeouts
-                self.recipe_scanner._cache.raw_data.append(recipe_data)
-                # Schedule a background task to resort the cache
-                asyncio.create_task(self.recipe_scanner._cache.resort())
+                # Single-entry insert into the sorted views; no full resort
+                self.recipe_scanner._cache.insert_sorted(recipe_data)
                 logger.info(f"Added recipe {recipe_id} to cache")
             
-            return web.json_response({
+            return json_response({
                 'success': True,
                 'recipe_id': recipe_id,
                 'image_path': image_path,
@@ -510,7 +734,7 @@ class RecipeRoutes:
             
         except Exception as e:
             logger.error(f"Error saving recipe: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500) 
+            return json_response({"error": str(e)}, status=500) 
 
     async def delete_recipe(self, request: web.Request) -> web.Response:
         """Delete a recipe by ID"""
@@ -520,44 +744,51 @@ class RecipeRoutes:
             # Get recipes directory
             recipes_dir = self.recipe_scanner.recipes_dir
             if not recipes_dir or not os.path.exists(recipes_dir):
-                return web.json_response({"error": "Recipes directory not found"}, status=404)
+                return json_response({"error": "Recipes directory not found"}, status=404)
             
             # Find recipe JSON file
             recipe_json_path = os.path.join(recipes_dir, f"{recipe_id}.recipe.json")
             if not os.path.exists(recipe_json_path):
-                return web.json_response({"error": "Recipe not found"}, status=404)
-            
-            # Load recipe data to get image path
-            with open(recipe_json_path, 'r', encoding='utf-8') as f:
-                recipe_data = json.load(f)
+                return json_response({"error": "Recipe not found"}, status=404)
             
+            # The cached entry already carries file_path, so the JSON file
+            # only needs to be parsed when the recipe isn't cached
+            recipe_data = None
+            if self.recipe_scanner._cache is not None:
+                recipe_data = self.recipe_scanner._cache.get_recipe_by_id(recipe_id)
+            if recipe_data is None:
+                recipe_data = await self._run_blocking(self._read_json, recipe_json_path)
+
             # Get image path
             image_path = recipe_data.get('file_path')
-            
+
             # Delete recipe JSON file
-            os.remove(recipe_json_path)
+            await self._run_blocking(os.remove, recipe_json_path)
             logger.info(f"Deleted recipe JSON file: {recipe_json_path}")
-            
+
             # Delete recipe image if it exists
             if image_path and os.path.exists(image_path):
-                os.remove(image_path)
+                await self._run_blocking(os.remove, image_path)
                 logger.info(f"Deleted recipe image: {image_path}")
             
             # Simplified cache update approach
             if self.recipe_scanner._cache is not None:
                 # Remove the recipe from raw_data if it exists
                 self.recipe_scanner._cache.raw_data = [
-                    r for r in self.recipe_scanner._cache.raw_data 
+                    r for r in self.recipe_scanner._cache.raw_data
                     if str(r.get('id', '')) != recipe_id
                 ]
+                self.recipe_scanner._cache._by_id.pop(recipe_id, None)
+                self.recipe_scanner._cache.discount_recipe(recipe_data)
+                self.recipe_scanner._cache._version += 1
                 # Schedule a background task to resort the cache
                 asyncio.create_task(self.recipe_scanner._cache.resort())
                 logger.info(f"Removed recipe {recipe_id} from cache")
             
-            return web.json_response({"success": True, "message": "Recipe deleted successfully"})
+            return json_response({"success": True, "message": "Recipe deleted successfully"})
         except Exception as e:
             logger.error(f"Error deleting recipe: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500) 
+            return json_response({"error": str(e)}, status=500) 
 
     async def get_top_tags(self, request: web.Request) -> web.Response:
         """Get top tags used in recipes"""
@@ -567,26 +798,18 @@ class RecipeRoutes:
             
             # Get all recipes from cache
             cache = await self.recipe_scanner.get_cached_data()
+
+            # Counters are maintained incrementally on the cache
+            top_tags = [{'tag': tag, 'count': count}
+                        for tag, count in cache._tag_counter.most_common(limit)]
             
-            # Count tag occurrences
-            tag_counts = {}
-            for recipe in cache.raw_data:
-                if 'tags' in recipe and recipe['tags']:
-                    for tag in recipe['tags']:
-                        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-            
-            # Sort tags by count and limit results
-            sorted_tags = [{'tag': tag, 'count': count} for tag, count in tag_counts.items()]
-            sorted_tags.sort(key=lambda x: x['count'], reverse=True)
-            top_tags = sorted_tags[:limit]
-            
-            return web.json_response({
+            return json_response({
                 'success': True,
                 'tags': top_tags
             })
         except Exception as e:
             logger.error(f"Error retrieving top tags: {e}", exc_info=True)
-            return web.json_response({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }, status=500)
@@ -596,25 +819,18 @@ class RecipeRoutes:
         try:
             # Get all recipes from cache
             cache = await self.recipe_scanner.get_cached_data()
+
+            # Counters are maintained incrementally on the cache
+            sorted_models = [{'name': model, 'count': count}
+                             for model, count in cache._base_model_counter.most_common()]
             
-            # Count base model occurrences
-            base_model_counts = {}
-            for recipe in cache.raw_data:
-                if 'base_model' in recipe and recipe['base_model']:
-                    base_model = recipe['base_model']
-                    base_model_counts[base_model] = base_model_counts.get(base_model, 0) + 1
-            
-            # Sort base models by count
-            sorted_models = [{'name': model, 'count': count} for model, count in base_model_counts.items()]
-            sorted_models.sort(key=lambda x: x['count'], reverse=True)
-            
-            return web.json_response({
+            return json_response({
                 'success': True,
                 'base_models': sorted_models
             })
         except Exception as e:
             logger.error(f"Error retrieving base models: {e}", exc_info=True)
-            return web.json_response({
+            return json_response({
                 'success': False,
                 'error': str(e)
             }, status=500) 
@@ -628,55 +844,44 @@ class RecipeRoutes:
             cache = await self.recipe_scanner.get_cached_data()
             
             # Find the specific recipe
-            recipe = next((r for r in cache.raw_data if str(r.get('id', '')) == recipe_id), None)
-            
+            recipe = cache.get_recipe_by_id(recipe_id)
+
             if not recipe:
-                return web.json_response({"error": "Recipe not found"}, status=404)
-            
+                return json_response({"error": "Recipe not found"}, status=404)
+
             # Get the image path
             image_path = recipe.get('file_path')
             if not image_path or not os.path.exists(image_path):
-                return web.json_response({"error": "Recipe image not found"}, status=404)
+                return json_response({"error": "Recipe image not found"}, status=404)
             
-            # Create a temporary copy of the image to modify
-            import tempfile
-            import shutil
-            
-            # Create temp file with same extension
+            # The recipe image already has its metadata baked in at save
+            # time, so it can be served as-is without copying it
             ext = os.path.splitext(image_path)[1]
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Copy the original image to temp file
-            shutil.copy2(image_path, temp_path)
-            processed_path = temp_path
-            
+
             # Create a URL for the processed image
             # Use a timestamp to prevent caching
             timestamp = int(time.time())
             url_path = f"/api/recipe/{recipe_id}/share/download?t={timestamp}"
-            
-            # Store the temp path in a dictionary to serve later
-            if not hasattr(self, '_shared_recipes'):
-                self._shared_recipes = {}
-            
+
+            # Register the original file; readonly tells the GC to drop the
+            # entry without unlinking the library image
+            expires = time.time() + 300  # Expire after 5 minutes
             self._shared_recipes[recipe_id] = {
-                'path': processed_path,
+                'path': image_path,
                 'timestamp': timestamp,
-                'expires': time.time() + 300  # Expire after 5 minutes
+                'expires': expires,
+                'readonly': True
             }
-            
-            # Clean up old entries
-            self._cleanup_shared_recipes()
-            
-            return web.json_response({
+            heapq.heappush(self._shared_expiry_heap, (expires, recipe_id))
+
+            return json_response({
                 'success': True,
                 'download_url': url_path,
-                'filename': f"recipe_{recipe.get('title', '').replace(' ', '_').lower()}{ext}"
+                'filename': f"recipe_{recipe.get('slug') or _slugify(recipe.get('title', ''))}{ext}"
             })
         except Exception as e:
             logger.error(f"Error sharing recipe: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
 
     async def download_shared_recipe(self, request: web.Request) -> web.Response:
         """Serve a processed recipe image for download"""
@@ -684,55 +889,41 @@ class RecipeRoutes:
             recipe_id = request.match_info['recipe_id']
             
             # Check if we have this shared recipe
-            if not hasattr(self, '_shared_recipes') or recipe_id not in self._shared_recipes:
-                return web.json_response({"error": "Shared recipe not found or expired"}, status=404)
+            if recipe_id not in self._shared_recipes:
+                return json_response({"error": "Shared recipe not found or expired"}, status=404)
             
             shared_info = self._shared_recipes[recipe_id]
             file_path = shared_info['path']
-            
-            if not os.path.exists(file_path):
-                return web.json_response({"error": "Shared recipe file not found"}, status=404)
-            
+
+            # Single stat doubles as the existence check and gives us the
+            # size for an explicit Content-Length
+            try:
+                file_size = os.path.getsize(file_path)
+            except OSError:
+                return json_response({"error": "Shared recipe file not found"}, status=404)
+
             # Get recipe to determine filename
             cache = await self.recipe_scanner.get_cached_data()
-            recipe = next((r for r in cache.raw_data if str(r.get('id', '')) == recipe_id), None)
+            recipe = cache.get_recipe_by_id(recipe_id)
             
             # Set filename for download
-            filename = f"recipe_{recipe.get('title', '').replace(' ', '_').lower() if recipe else recipe_id}"
+            filename = f"recipe_{(recipe.get('slug') or _slugify(recipe.get('title', ''))) if recipe else recipe_id}"
             ext = os.path.splitext(file_path)[1]
             download_filename = f"{filename}{ext}"
             
-            # Serve the file
+            # Serve the file; FileResponse takes the sendfile(2) zero-copy
+            # path and the larger chunk size covers the fallback loop
             return web.FileResponse(
                 file_path,
+                chunk_size=256 * 1024,
                 headers={
-                    'Content-Disposition': f'attachment; filename="{download_filename}"'
+                    'Content-Disposition': f'attachment; filename="{download_filename}"',
+                    'Content-Length': str(file_size)
                 }
             )
         except Exception as e:
             logger.error(f"Error downloading shared recipe: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500)
-
-    def _cleanup_shared_recipes(self):
-        """Clean up expired shared recipes"""
-        if not hasattr(self, '_shared_recipes'):
-            return
-        
-        current_time = time.time()
-        expired_ids = [rid for rid, info in self._shared_recipes.items() 
-                      if current_time > info.get('expires', 0)]
-        
-        for rid in expired_ids:
-            try:
-                # Delete the temporary file
-                file_path = self._shared_recipes[rid]['path']
-                if os.path.exists(file_path):
-                    os.unlink(file_path)
-                
-                # Remove from dictionary
-                del self._shared_recipes[rid]
-            except Exception as e:
-                logger.error(f"Error cleaning up shared recipe {rid}: {e}")
+            return json_response({"error": str(e)}, status=500)
 
     async def save_recipe_from_widget(self, request: web.Request) -> web.Response:
         """Save a recipe from the LoRAs widget"""
@@ -748,99 +939,101 @@ class RecipeRoutes:
                     break
                 
                 if field.name == 'workflow_json':
-                    workflow_text = await field.text()
+                    # Read in chunks with a size cap instead of buffering an
+                    # unbounded field via field.text()
+                    buf = bytearray()
+                    while True:
+                        chunk = await field.read_chunk(65536)
+                        if not chunk:
+                            break
+                        if len(buf) + len(chunk) > _MAX_WORKFLOW_JSON_SIZE:
+                            return json_response({"error": "workflow_json too large"}, status=413)
+                        buf.extend(chunk)
                     try:
-                        workflow_json = json.loads(workflow_text)
+                        workflow_json = json_loads(bytes(buf))
                     except:
-                        return web.json_response({"error": "Invalid workflow JSON"}, status=400)
+                        return json_response({"error": "Invalid workflow JSON"}, status=400)
             
             if not workflow_json:
-                return web.json_response({"error": "Missing required workflow_json field"}, status=400)
+                return json_response({"error": "Missing required workflow_json field"}, status=400)
             
-            # Find the latest image in the temp directory
+            # Find the latest image in the temp directory; scandir carries
+            # stat info with each entry so there's no extra stat per file
             temp_dir = config.temp_directory
-            image_files = []
-            
-            for file in os.listdir(temp_dir):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
-                    file_path = os.path.join(temp_dir, file)
-                    image_files.append((file_path, os.path.getmtime(file_path)))
-            
-            if not image_files:
-                return web.json_response({"error": "No recent images found to use for recipe"}, status=400)
-            
-            # Sort by modification time (newest first)
-            image_files.sort(key=lambda x: x[1], reverse=True)
-            latest_image_path = image_files[0][0]
+            with os.scandir(temp_dir) as it:
+                latest_entry = max(
+                    (entry for entry in it
+                     if entry.name.rpartition('.')[2].lower() in _IMAGE_EXTS
+                     and entry.is_file()),
+                    key=lambda entry: entry.stat().st_mtime,
+                    default=None
+                )
+
+            if latest_entry is None:
+                return json_response({"error": "No recent images found to use for recipe"}, status=400)
+
+            latest_image_path = latest_entry.path
             
             # Parse the workflow to extract generation parameters and loras
             parsed_workflow = self.parser.parse_workflow(workflow_json)
 
             if not parsed_workflow or not parsed_workflow.get("gen_params"):
-                return web.json_response({"error": "Could not extract generation parameters from workflow"}, status=400)
+                return json_response({"error": "Could not extract generation parameters from workflow"}, status=400)
             
             # Get the lora stack from the parsed workflow
             lora_stack = parsed_workflow.get("loras", "")
             
             # Parse the lora stack format: "<lora:name:strength> <lora:name2:strength2> ..."
-            import re
-            lora_matches = re.findall(r'<lora:([^:]+):([^>]+)>', lora_stack)
+            lora_matches = _LORA_RE.findall(lora_stack)
             
             # Check if any loras were found
             if not lora_matches:
-                return web.json_response({"error": "No LoRAs found in the workflow"}, status=400)
+                return json_response({"error": "No LoRAs found in the workflow"}, status=400)
             
             # Generate recipe name from the first 3 loras (or less if fewer are available)
-            loras_for_name = lora_matches[:3]  # Take at most 3 loras for the name
-            
-            recipe_name_parts = []
-            for lora_name, lora_strength in loras_for_name:
-                # Get the basename without path or extension
-                basename = os.path.basename(lora_name)
-                basename = os.path.splitext(basename)[0]
-                recipe_name_parts.append(f"{basename}:{lora_strength}")
-            
-            recipe_name = " ".join(recipe_name_parts)
-            
-            # Read the image
-            with open(latest_image_path, 'rb') as f:
-                image = f.read()
+            recipe_name = " ".join(
+                f"{_lora_stem(name)}:{strength}"
+                for name, strength in lora_matches[:3]
+            )
             
             # Create recipes directory if it doesn't exist
             recipes_dir = self.recipe_scanner.recipes_dir
-            os.makedirs(recipes_dir, exist_ok=True)
-            
+            await self._run_blocking(os.makedirs, recipes_dir, exist_ok=True)
+
             # Generate UUID for the recipe
-            import uuid
-            recipe_id = str(uuid.uuid4())
-            
-            # Optimize the image (resize and convert to WebP)
-            optimized_image, extension = ExifUtils.optimize_image(
-                image_data=image,
-                target_width=480,
-                format='webp',
-                quality=85,
-                preserve_metadata=True
+            recipe_id = uuid.uuid4().hex
+
+            # Destination for the optimized recipe image; the write itself
+            # happens in one fused pass once the recipe data is assembled
+            image_path = os.path.join(recipes_dir, f"{recipe_id}.webp")
+
+            # Resolve every unique lora concurrently instead of one await
+            # per entry, then build the recipe from the in-memory map
+            unique_names = list({name for name, _ in lora_matches})
+            infos = await asyncio.gather(
+                *(self.recipe_scanner._lora_scanner.get_lora_info_by_name(name)
+                  for name in unique_names),
+                return_exceptions=True
             )
-            
-            # Save the optimized image
-            image_filename = f"{recipe_id}{extension}"
-            image_path = os.path.join(recipes_dir, image_filename)
-            with open(image_path, 'wb') as f:
-                f.write(optimized_image)
-            
-            # Format loras data from the lora stack
+            lora_info_cache = {}
+            for name, info in zip(unique_names, infos):
+                if isinstance(info, Exception):
+                    logger.warning(f"Error looking up LoRA {name}: {info}")
+                    info = None
+                lora_info_cache[name] = info
+
+            # Format loras data and count base models in one pass
             loras_data = []
-            
+            base_model_counts = {}
+
             for lora_name, lora_strength in lora_matches:
                 try:
-                    # Get lora info from scanner
-                    lora_info = await self.recipe_scanner._lora_scanner.get_lora_info_by_name(lora_name)
-                    
+                    lora_info = lora_info_cache.get(lora_name)
+
                     # Create lora entry
                     lora_entry = {
                         "file_name": lora_name,
-                        "hash": lora_info.get("sha256", "").lower() if lora_info else "",
+                        "hash": lora_info.get("sha256", "") if lora_info else "",
                         "strength": float(lora_strength),
                         "modelVersionId": lora_info.get("civitai", {}).get("id", "") if lora_info else "",
                         "modelName": lora_info.get("civitai", {}).get("model", {}).get("name", "") if lora_info else lora_name,
@@ -848,17 +1041,13 @@ class RecipeRoutes:
                         "isDeleted": False
                     }
                     loras_data.append(lora_entry)
+
+                    if lora_info and "base_model" in lora_info:
+                        base_model = lora_info["base_model"]
+                        base_model_counts[base_model] = base_model_counts.get(base_model, 0) + 1
                 except Exception as e:
                     logger.warning(f"Error processing LoRA {lora_name}: {e}")
             
-            # Get base model from lora scanner for the available loras
-            base_model_counts = {}
-            for lora in loras_data:
-                lora_info = await self.recipe_scanner._lora_scanner.get_lora_info_by_name(lora.get("file_name", ""))
-                if lora_info and "base_model" in lora_info:
-                    base_model = lora_info["base_model"]
-                    base_model_counts[base_model] = base_model_counts.get(base_model, 0) + 1
-            
             # Get most common base model
             most_common_base_model = ""
             if base_model_counts:
@@ -869,6 +1058,7 @@ class RecipeRoutes:
                 "id": recipe_id,
                 "file_path": image_path,
                 "title": recipe_name,  # Use generated recipe name
+                "slug": _slugify(recipe_name),
                 "modified": time.time(),
                 "created_date": time.time(),
                 "base_model": most_common_base_model,
@@ -877,24 +1067,24 @@ class RecipeRoutes:
                 "loras_stack": lora_stack  # Include the original lora stack string
             }
             
-            # Save the recipe JSON
+            # Decode, resize, tag and encode the image in one pass on
+            # another core - no intermediate write followed by a rewrite
+            await self._run_cpu(
+                ExifUtils.optimize_and_tag, latest_image_path, image_path, recipe_data, 480, 85
+            )
+
+            # Save the recipe JSON off the event loop
             json_filename = f"{recipe_id}.recipe.json"
             json_path = os.path.join(recipes_dir, json_filename)
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(recipe_data, f, indent=4, ensure_ascii=False)
-
-            # Add recipe metadata to the image
-            ExifUtils.append_recipe_metadata(image_path, recipe_data)
+            await self._run_blocking(self._write_json, json_path, recipe_data)
             
             # Update cache
             if self.recipe_scanner._cache is not None:
-                # Add the recipe to the raw data if the cache exists
-                self.recipe_scanner._cache.raw_data.append(recipe_data)
-                # Schedule a background task to resort the cache
-                asyncio.create_task(self.recipe_scanner._cache.resort())
+                # Single-entry insert into the sorted views; no full resort
+                self.recipe_scanner._cache.insert_sorted(recipe_data)
                 logger.info(f"Added recipe {recipe_id} to cache")
             
-            return web.json_response({
+            return json_response({
                 'success': True,
                 'recipe_id': recipe_id,
                 'image_path': image_path,
@@ -904,4 +1094,4 @@ class RecipeRoutes:
             
         except Exception as e:
             logger.error(f"Error saving recipe from widget: {e}", exc_info=True)
-            return web.json_response({"error": str(e)}, status=500)
+            return json_response({"error": str(e)}, status=500)
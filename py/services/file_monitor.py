@@ -2,54 +2,86 @@ from operator import itemgetter
 import os
 import logging
 import asyncio
+import threading
+from functools import lru_cache
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileDeletedEvent
+from watchdog.events import PatternMatchingEventHandler
 from typing import List
-from threading import Lock
 from .lora_scanner import LoraScanner
 from ..config import config
+from ..utils.file_utils import normalize_path
 
 logger = logging.getLogger(__name__)
 
-class LoraFileHandler(FileSystemEventHandler):
-    """Handler for LoRA file system events"""
-    
+@lru_cache(maxsize=4096)
+def _realpath_cached(path: str) -> str:
+    """Resolved path with forward slashes, cached per raw path
+
+    realpath walks every component to chase symlinks - a syscall cascade
+    watchdog would otherwise pay per event during a burst. Symlink
+    retargeting (which would stale the cache) effectively doesn't happen
+    to a live lora library.
+    """
+    return normalize_path(os.path.realpath(path))
+
+@lru_cache(maxsize=8192)
+def _map_path_cached(path: str) -> str:
+    """config.map_path_to_link memoized per raw event path
+
+    The mapping walks every symlink target linearly; events for the
+    same file (create/modify bursts) repeat identical inputs, so a
+    cache collapses that to one lookup. Cleared when new link mappings
+    are discovered via rescan_links.
+    """
+    return config.map_path_to_link(path)
+
+class LoraFileHandler(PatternMatchingEventHandler):
+    """Handler for LoRA file system events
+
+    Pattern matching happens in watchdog's dispatch, so sidecar and
+    preview writes (.json, .png, .tmp, ...) never reach our callbacks
+    during download bursts.
+    """
+
     def __init__(self, scanner: LoraScanner, loop: asyncio.AbstractEventLoop):
+        super().__init__(patterns=["*.safetensors"], ignore_directories=True)
         self.scanner = scanner
         self.loop = loop  # 存储事件循环引用
-        self.pending_changes = set()  # 待处理的变更
-        self.lock = Lock()  # 线程安全锁
+        # 待处理的变更；只在事件循环线程上访问，因此无需加锁
+        self.pending_changes = set()
         self.update_task = None  # 异步更新任务
+        self._loop_thread_id = None  # Set when the serving loop is bound
         self._ignore_paths = {}  # Change to dictionary to store expiration times
         self._min_ignore_timeout = 5  # minimum timeout in seconds
         self._download_speed = 1024 * 1024  # assume 1MB/s as base speed
 
     def _should_ignore(self, path: str) -> bool:
         """Check if path should be ignored"""
-        real_path = os.path.realpath(path)  # Resolve any symbolic links
-        normalized_path = real_path.replace(os.sep, '/')
-        
-        # Also check with backslashes for Windows compatibility
-        alt_path = real_path.replace('/', '\\')
-        
         # 使用传入的事件循环而不是尝试获取当前线程的事件循环
         current_time = self.loop.time()
-        
+
+        # Cheap check on the raw path first; only resolve symlinks on miss
+        expiration = self._ignore_paths.get(normalize_path(path))
+        if expiration is not None and expiration > current_time:
+            return True
+
+        normalized_path = _realpath_cached(path)  # Resolve any symbolic links
+
         # Check if path is in ignore list and not expired
         if normalized_path in self._ignore_paths and self._ignore_paths[normalized_path] > current_time:
             return True
-        
-        # Also check alternative path format
+
+        # Also check with backslashes for Windows compatibility
+        alt_path = normalized_path.replace('/', '\\')
         if alt_path in self._ignore_paths and self._ignore_paths[alt_path] > current_time:
             return True
-            
+
         return False
 
     def add_ignore_path(self, path: str, file_size: int = 0):
         """Add path to ignore list with dynamic timeout based on file size"""
-        real_path = os.path.realpath(path)  # Resolve any symbolic links
-        normalized_path = real_path.replace(os.sep, '/')
-        
+        normalized_path = _realpath_cached(path)  # Resolve any symbolic links
+
         # Calculate timeout based on file size
         # For small files, use minimum timeout
         # For larger files, estimate download time + buffer
@@ -67,10 +99,10 @@ class LoraFileHandler(FileSystemEventHandler):
         self._ignore_paths[normalized_path] = expiration_time
         
         # Also store with backslashes for Windows compatibility
-        alt_path = real_path.replace('/', '\\')
+        alt_path = normalized_path.replace('/', '\\')
         self._ignore_paths[alt_path] = expiration_time
         
-        logger.debug(f"Added ignore path: {normalized_path} (expires in {timeout:.1f}s)")
+        logger.debug("Added ignore path: %s (expires in %.1fs)", normalized_path, timeout)
         
         self.loop.call_later(
             timeout,
@@ -82,7 +114,7 @@ class LoraFileHandler(FileSystemEventHandler):
         """Remove path from ignore list after timeout"""
         if path in self._ignore_paths:
             del self._ignore_paths[path]
-            logger.debug(f"Removed ignore path: {path}")
+            logger.debug("Removed ignore path: %s", path)
         
         # Also remove alternative path format
         alt_path = path.replace('/', '\\')
@@ -90,45 +122,65 @@ class LoraFileHandler(FileSystemEventHandler):
             del self._ignore_paths[alt_path]
 
     def on_created(self, event):
-        if event.is_directory or not event.src_path.endswith('.safetensors'):
-            return
         if self._should_ignore(event.src_path):
             return
-        logger.info(f"LoRA file created: {event.src_path}")
+        # Lazy %s formatting: nothing is built unless DEBUG is enabled,
+        # which matters at per-event frequency during bursts
+        logger.debug("LoRA file created: %s", event.src_path)
         self._schedule_update('add', event.src_path)
 
     def on_deleted(self, event):
-        if event.is_directory or not event.src_path.endswith('.safetensors'):
-            return
         if self._should_ignore(event.src_path):
             return
-        logger.info(f"LoRA file deleted: {event.src_path}")
+        logger.debug("LoRA file deleted: %s", event.src_path)
         self._schedule_update('remove', event.src_path)
         
     def _schedule_update(self, action: str, file_path: str): #file_path is a real path
-        """Schedule a cache update"""
-        with self.lock:
-            # 使用 config 中的方法映射路径
-            mapped_path = config.map_path_to_link(file_path)
-            normalized_path = mapped_path.replace(os.sep, '/')
-            self.pending_changes.add((action, normalized_path))
-            
-            self.loop.call_soon_threadsafe(self._create_update_task)
+        """Schedule a cache update from the watchdog thread"""
+        # 使用 config 中的方法映射路径
+        mapped_path = _map_path_cached(file_path)
+        normalized_path = normalize_path(mapped_path)
+        # Hand the mutation to the loop thread: pending_changes is only
+        # ever touched there, so no lock is needed and the copy/clear in
+        # _process_changes can't race with the observer thread. When the
+        # caller is already the loop thread, skip call_soon_threadsafe's
+        # wakeup-pipe write and enqueue directly
+        if threading.get_ident() == self._loop_thread_id:
+            self._enqueue_change(action, normalized_path)
+        else:
+            self.loop.call_soon_threadsafe(self._enqueue_change, action, normalized_path)
+
+    def _enqueue_change(self, action: str, file_path: str):
+        """Record a change and ensure the update task runs (loop thread only)"""
+        self.pending_changes.add((action, file_path))
+        self._create_update_task()
 
     def _create_update_task(self):
         """Create update task in the event loop"""
         if self.update_task is None or self.update_task.done():
             self.update_task = asyncio.create_task(self._process_changes())
 
-    async def _process_changes(self, delay: float = 2.0):
-        """Process pending changes with debouncing"""
-        await asyncio.sleep(delay)
-        
+    async def _process_changes(self, quiet_period: float = 0.25, max_wait: float = 0.5):
+        """Process pending changes with debouncing
+
+        A single dropped file is processed after one short quiet period
+        instead of a flat two-second wait; events arriving during the
+        window extend it, capped at max_wait so a sustained burst (bulk
+        import) still coalesces into batches that flush promptly.
+        """
+        deadline = self.loop.time() + max_wait
+        while True:
+            seen = len(self.pending_changes)
+            await asyncio.sleep(quiet_period)
+            # Quiet period elapsed with no new events, or cap reached
+            if len(self.pending_changes) == seen or self.loop.time() >= deadline:
+                break
+
+
         try:
-            with self.lock:
-                changes = self.pending_changes.copy()
-                self.pending_changes.clear()
-            
+            changes = self.pending_changes.copy()
+            self.pending_changes.clear()
+
             if not changes:
                 return
             
@@ -136,58 +188,110 @@ class LoraFileHandler(FileSystemEventHandler):
 
             cache = await self.scanner.get_cached_data()
             needs_resort = False
-            new_folders = set()
-            
+            added_any = False
+            remove_paths = set()
+
+            # Scan new files concurrently: the hashing inside
+            # scan_single_lora runs in worker threads and releases the
+            # GIL, so a bounded gather overlaps disk and hash work when
+            # many files land at once instead of hashing one after
+            # another. Per-file failures stay isolated as exceptions.
+            add_paths = [file_path for action, file_path in changes if action == 'add']
+            scan_results = []
+            if add_paths:
+                semaphore = asyncio.Semaphore(4)
+
+                async def scan_one(path):
+                    async with semaphore:
+                        return await self.scanner.scan_single_lora(path)
+
+                scan_results = await asyncio.gather(
+                    *(scan_one(path) for path in add_paths),
+                    return_exceptions=True
+                )
+
+            for file_path, lora_data in zip(add_paths, scan_results):
+                try:
+                    if isinstance(lora_data, BaseException):
+                        raise lora_data
+                    if lora_data:
+                        # Update tags count and the tag inverted index so
+                        # tag filtering sees the new item without a rescan
+                        item_id = id(lora_data)
+                        for tag in lora_data.get('tags', []):
+                            self.scanner._tags_count[tag] = self.scanner._tags_count.get(tag, 0) + 1
+                            self.scanner._tags_to_items.setdefault(tag, set()).add(item_id)
+
+                        cache.raw_data.append(lora_data)
+                        # Update hash index
+                        if 'sha256' in lora_data:
+                            self.scanner._hash_index.add_entry(
+                                lora_data['sha256'],
+                                lora_data['file_path']
+                            )
+                        needs_resort = True
+                        added_any = True
+                except Exception as e:
+                    logger.error(f"Error processing add for {file_path}: {e}")
+
+            if added_any:
+                # A name looked up before its file landed is cached as
+                # missing; the library changed, so those entries are stale
+                self.scanner._missing_names.clear()
+
             for action, file_path in changes:
                 try:
-                    if action == 'add':
-                        # Scan new file
-                        lora_data = await self.scanner.scan_single_lora(file_path)
-                        if lora_data:
-                            # Update tags count
-                            for tag in lora_data.get('tags', []):
-                                self.scanner._tags_count[tag] = self.scanner._tags_count.get(tag, 0) + 1
-                            
-                            cache.raw_data.append(lora_data)
-                            new_folders.add(lora_data['folder'])
-                            # Update hash index
-                            if 'sha256' in lora_data:
-                                self.scanner._hash_index.add_entry(
-                                    lora_data['sha256'], 
-                                    lora_data['file_path']
-                                )
-                            needs_resort = True
-                            
-                    elif action == 'remove':
-                        # Find the lora to remove so we can update tags count
-                        lora_to_remove = next((item for item in cache.raw_data if item['file_path'] == file_path), None)
+                    if action == 'remove':
+                        # Locate via the path index (valid while raw_data
+                        # is only appended to within this batch) so tag
+                        # counts update without an O(N) scan per delete
+                        idx = cache.by_path.get(file_path)
+                        lora_to_remove = (
+                            cache.raw_data[idx]
+                            if idx is not None and idx < len(cache.raw_data)
+                            and cache.raw_data[idx]['file_path'] == file_path
+                            else None
+                        )
                         if lora_to_remove:
-                            # Update tags count by reducing counts
+                            # Update tags count and drop the item from the
+                            # inverted index; a stale id() entry could
+                            # false-match a recycled dict later
+                            removed_id = id(lora_to_remove)
                             for tag in lora_to_remove.get('tags', []):
                                 if tag in self.scanner._tags_count:
                                     self.scanner._tags_count[tag] = max(0, self.scanner._tags_count[tag] - 1)
                                     if self.scanner._tags_count[tag] == 0:
                                         del self.scanner._tags_count[tag]
-                        
-                        # Remove from cache and hash index
-                        logger.info(f"Removing {file_path} from cache")
+                                items = self.scanner._tags_to_items.get(tag)
+                                if items is not None:
+                                    items.discard(removed_id)
+                                    if not items:
+                                        del self.scanner._tags_to_items[tag]
+
+                        # Defer the actual removal so a burst of deletes
+                        # costs one pass over raw_data, not one per file
                         self.scanner._hash_index.remove_by_path(file_path)
-                        cache.raw_data = [
-                            item for item in cache.raw_data 
-                            if item['file_path'] != file_path
-                        ]
+                        remove_paths.add(file_path)
                         needs_resort = True
-                        
+
                 except Exception as e:
                     logger.error(f"Error processing {action} for {file_path}: {e}")
-            
+
+            if remove_paths:
+                logger.info(f"Removing {len(remove_paths)} files from cache")
+                cache.raw_data = [
+                    item for item in cache.raw_data
+                    if item['file_path'] not in remove_paths
+                ]
+
             if needs_resort:
+                # resort() rebuilds cache.folders from its per-folder
+                # refcounts, so no separate set-union + sort pass is
+                # needed here (it also kept folders of deleted loras
+                # alive forever)
                 await cache.resort()
-                
-                # Update folder list
-                all_folders = set(cache.folders) | new_folders
-                cache.folders = sorted(list(all_folders), key=lambda x: x.lower())
-                
+
+
         except Exception as e:
             logger.error(f"Error in process_changes: {e}")
 
@@ -198,19 +302,35 @@ class LoraFileMonitor:
     def __init__(self, scanner: LoraScanner, roots: List[str]):
         self.scanner = scanner
         scanner.set_file_monitor(self)
+        # Observer auto-selects the kernel notification backend (inotify on
+        # Linux, FSEvents on macOS, ReadDirectoryChangesW on Windows), so no
+        # directory polling happens while idle
         self.observer = Observer()
-        self.loop = asyncio.get_event_loop()
-        self.handler = LoraFileHandler(scanner, self.loop)
+        # Bound to the serving loop via bind_loop once the app starts, so
+        # construction at import time never captures the wrong loop
+        self.loop = None
+        self.handler = LoraFileHandler(scanner, None)
         
         # 使用已存在的路径映射
         self.monitor_paths = set()
         for root in roots:
-            self.monitor_paths.add(os.path.realpath(root).replace(os.sep, '/'))
+            self.monitor_paths.add(normalize_path(os.path.realpath(root)))
 
         # 添加所有已映射的目标路径
         for target_path in config._path_mappings.keys():
             self.monitor_paths.add(target_path)
 
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Bind the monitor and its handler to the serving event loop
+
+        Called from the serving loop's own thread, so the thread ident
+        captured here lets the handler tell loop-thread callers apart
+        from watchdog observer threads.
+        """
+        self.loop = loop
+        self.handler.loop = loop
+        self.handler._loop_thread_id = threading.get_ident()
+
     def start(self):
         """Start monitoring"""
         for path_info in self.monitor_paths:
@@ -234,8 +354,19 @@ class LoraFileMonitor:
         self.observer.stop()
         self.observer.join()
 
+    async def astop(self):
+        """Stop monitoring without blocking the event loop
+
+        The observer thread join happens in an executor so shutdown can
+        overlap with other cleanup coroutines.
+        """
+        self.observer.stop()
+        await asyncio.get_running_loop().run_in_executor(None, self.observer.join)
+
     def rescan_links(self):
         """重新扫描链接（当添加新的链接时调用）"""
+        # 链接映射可能已变化，失效事件路径映射缓存
+        _map_path_cached.cache_clear()
         new_paths = set()
         for path in self.monitor_paths.copy():
             self._add_link_targets(path)
@@ -1,8 +1,17 @@
 import asyncio
+from collections import Counter
 from typing import List, Dict
 from dataclasses import dataclass
 from operator import itemgetter
 
+from ..utils.constants import NSFW_LEVELS
+
+
+def _is_sfw(item: Dict) -> bool:
+    """Whether an item passes the show-only-sfw preview filter"""
+    nsfw_level = item.get('preview_nsfw_level')
+    return not nsfw_level or nsfw_level < NSFW_LEVELS['R']
+
 @dataclass
 class LoraCache:
     """Cache structure for LoRA data"""
@@ -13,23 +22,71 @@ class LoraCache:
     
     def __post_init__(self):
         self._lock = asyncio.Lock()
+        # SFW-filtered views kept in step with the sorted lists so the
+        # show-only-sfw filter is a reference swap, not an O(N) pass
+        self.sorted_by_name_sfw: List[Dict] = []
+        self.sorted_by_date_sfw: List[Dict] = []
+        # Folder -> items buckets preserving each view's order, plus a
+        # lexicographically sorted folder list for recursive prefix ranges
+        self.by_folder_name: Dict[str, List[Dict]] = {}
+        self.by_folder_date: Dict[str, List[Dict]] = {}
+        self.folder_list: List[str] = []
+        self._folder_counts: Counter = Counter()
+        # file_path -> index into raw_data for O(1) lookup and removal
+        self.by_path: Dict[str, int] = {
+            item['file_path']: idx for idx, item in enumerate(self.raw_data)
+        }
+        # file_name -> item for O(1) name lookups on request paths
+        self.by_filename: Dict[str, Dict] = {
+            item['file_name']: item for item in self.raw_data
+        }
 
     async def resort(self, name_only: bool = False):
         """Resort all cached data views"""
         async with self._lock:
+            # Precompute lowercase search fields once per entry so the
+            # search loop doesn't re-lower every string on each request.
+            # Every cache mutation funnels through resort, so these are
+            # always present on cached items.
+            for item in self.raw_data:
+                item['_name_lc'] = item.get('file_name', '').lower()
+                item['_model_lc'] = item.get('model_name', '').lower()
+                item['_tags_lc'] = [tag.lower() for tag in item.get('tags') or ()]
             self.sorted_by_name = sorted(
-                self.raw_data, 
-                key=lambda x: x['model_name'].lower()  # Case-insensitive sort
+                self.raw_data,
+                key=itemgetter('_model_lc')  # Case-insensitive sort
             )
+            self.sorted_by_name_sfw = [item for item in self.sorted_by_name if _is_sfw(item)]
             if not name_only:
                 self.sorted_by_date = sorted(
-                    self.raw_data, 
-                    key=itemgetter('modified'), 
+                    self.raw_data,
+                    key=itemgetter('modified'),
                     reverse=True
                 )
-            # Update folder list
-            all_folders = set(l['folder'] for l in self.raw_data)
-            self.folders = sorted(list(all_folders), key=lambda x: x.lower())
+                self.sorted_by_date_sfw = [item for item in self.sorted_by_date if _is_sfw(item)]
+            # Rebuild the folder buckets in view order so a folder filter
+            # is a dict lookup that still pages in the right sequence
+            by_folder_name: Dict[str, List[Dict]] = {}
+            for item in self.sorted_by_name:
+                by_folder_name.setdefault(item['folder'], []).append(item)
+            self.by_folder_name = by_folder_name
+            self.folder_list = sorted(by_folder_name)
+            if not name_only:
+                by_folder_date: Dict[str, List[Dict]] = {}
+                for item in self.sorted_by_date:
+                    by_folder_date.setdefault(item['folder'], []).append(item)
+                self.by_folder_date = by_folder_date
+            # Update folder list; Counter collects the distinct folders in
+            # C and keeps per-folder counts available for callers
+            self._folder_counts = Counter(l['folder'] for l in self.raw_data)
+            self.folders = sorted(self._folder_counts, key=str.lower)
+            # Keep the path and name indexes in step with raw_data
+            self.by_path = {
+                item['file_path']: idx for idx, item in enumerate(self.raw_data)
+            }
+            self.by_filename = {
+                item['file_name']: item for item in self.raw_data
+            }
 
     async def update_preview_url(self, file_path: str, preview_url: str) -> bool:
         """Update preview_url for a specific lora in all cached data
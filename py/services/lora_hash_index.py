@@ -1,54 +1,68 @@
 from typing import Dict, Optional
 import logging
-from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
 class LoraHashIndex:
-    """Index for mapping LoRA file hashes to their file paths"""
-    
+    """Bidirectional index for mapping LoRA file hashes to their file paths
+
+    Hashes are lowercased once at the index boundary, so callers can pass
+    raw hashes and everything stored or returned is already normalized.
+    """
+
+    __slots__ = ('_hash_to_path', '_path_to_hash')
+
     def __init__(self):
         self._hash_to_path: Dict[str, str] = {}
-        
+        # Reverse mapping kept in sync so path lookups are O(1) too
+        self._path_to_hash: Dict[str, str] = {}
+
     def add_entry(self, sha256: str, file_path: str) -> None:
         """Add or update a hash -> path mapping"""
         if not sha256 or not file_path:
             return
         # Always store lowercase hashes for consistency
-        self._hash_to_path[sha256.lower()] = file_path
-        
+        sha256 = sha256.lower()
+        # Drop stale mappings before inserting so both dicts stay consistent
+        old_path = self._hash_to_path.get(sha256)
+        if old_path is not None and old_path != file_path:
+            self._path_to_hash.pop(old_path, None)
+        old_hash = self._path_to_hash.get(file_path)
+        if old_hash is not None and old_hash != sha256:
+            self._hash_to_path.pop(old_hash, None)
+        self._hash_to_path[sha256] = file_path
+        self._path_to_hash[file_path] = sha256
+
     def remove_entry(self, sha256: str) -> None:
         """Remove a hash entry"""
         if sha256:
-            self._hash_to_path.pop(sha256.lower(), None)
-        
+            path = self._hash_to_path.pop(sha256.lower(), None)
+            if path is not None:
+                self._path_to_hash.pop(path, None)
+
     def remove_by_path(self, file_path: str) -> None:
         """Remove entry by file path"""
-        for sha256, path in list(self._hash_to_path.items()):
-            if path == file_path:
-                del self._hash_to_path[sha256]
-                break
-                
+        sha256 = self._path_to_hash.pop(file_path, None)
+        if sha256 is not None:
+            self._hash_to_path.pop(sha256, None)
+
     def get_path(self, sha256: str) -> Optional[str]:
         """Get file path for a given hash"""
         if not sha256:
             return None
         return self._hash_to_path.get(sha256.lower())
-        
+
     def get_hash(self, file_path: str) -> Optional[str]:
         """Get hash for a given file path"""
-        for sha256, path in self._hash_to_path.items():
-            if path == file_path:
-                return sha256
-        return None
-        
+        return self._path_to_hash.get(file_path)
+
     def has_hash(self, sha256: str) -> bool:
         """Check if hash exists in index"""
         if not sha256:
             return False
         return sha256.lower() in self._hash_to_path
-        
+
     def clear(self) -> None:
         """Clear all entries"""
-        self._hash_to_path.clear() 
\ No newline at end of file
+        self._hash_to_path.clear()
+        self._path_to_hash.clear()
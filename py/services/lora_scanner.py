@@ -4,18 +4,22 @@ import logging
 import asyncio
 import shutil
 import time
+from collections import Counter, OrderedDict
 from typing import List, Dict, Optional
 
 from ..utils.models import LoraMetadata
 from ..config import config
 from ..utils.file_utils import load_metadata, get_file_info, normalize_path, find_preview_file, save_metadata
+from ..utils.json_utils import read_json_file, write_json_file
 from ..utils.lora_metadata import extract_lora_metadata
-from .lora_cache import LoraCache
+from bisect import bisect_left
+
+from .civitai_client import CivitaiClient
+from .lora_cache import LoraCache, _is_sfw
 from .lora_hash_index import LoraHashIndex
 from .settings_manager import settings
-from ..utils.constants import NSFW_LEVELS
 from ..utils.utils import fuzzy_match
-import sys
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +43,25 @@ class LoraScanner:
             self._initialization_task: Optional[asyncio.Task] = None
             self._initialized = True
             self.file_monitor = None  # Add this line
-            self._tags_count = {}  # Add a dictionary to store tag counts
+            self._tags_count = Counter()  # Tag counts; Counter increments run in C
+            self._tags_to_items = {}  # tag -> set of item ids for O(1) tag filtering
+            self._cache_ready = asyncio.Event()  # Set once the initial scan has completed
+            # Known-missing lora names so repeated failed lookups skip the
+            # linear scan; cleared whenever the library changes
+            self._missing_names = OrderedDict()
+            # Bigram -> set of file_paths over name/model/tags, used to
+            # narrow fuzzy search to plausible candidates
+            self._bigram_index = {}
+            # Loras whose Civitai enrichment is deferred until after the
+            # scan so startup never waits on network round-trips
+            self._pending_metadata_fetches = []
+            # Snapshot entries from the previous run, keyed by file_path;
+            # only populated for the duration of a scan
+            self._snapshot_entries = {}
+
+    async def wait_cache_ready(self):
+        """Wait until the initial cache scan has completed"""
+        await self._cache_ready.wait()
 
     def set_file_monitor(self, monitor):
         """Set file monitor instance"""
@@ -98,21 +120,36 @@ class LoraScanner:
             self._hash_index.clear()
             
             # Clear existing tags count
-            self._tags_count = {}
-            
+            self._tags_count = Counter()
+            self._tags_to_items = {}
+
+            # A rescan may surface previously missing names
+            self._missing_names.clear()
+
+            # Entries persisted at the end of the last scan let unchanged
+            # files skip their metadata reads entirely
+            self._snapshot_entries = await self._load_snapshot_entries()
+
             # Scan for new data
             raw_data = await self.scan_all_loras()
+            self._snapshot_entries = {}
             
-            # Build hash index and tags count
-            for lora_data in raw_data:
+            # Build hash index and tags count, yielding between batches so
+            # HTTP handlers are never starved by this startup task
+            for idx, lora_data in enumerate(raw_data):
                 if 'sha256' in lora_data and 'file_path' in lora_data:
-                    self._hash_index.add_entry(lora_data['sha256'].lower(), lora_data['file_path'])
-                
-                # Count tags
+                    self._hash_index.add_entry(lora_data['sha256'], lora_data['file_path'])
+
+                # Count tags and index the item under each tag
                 if 'tags' in lora_data and lora_data['tags']:
+                    item_id = id(lora_data)
+                    self._tags_count.update(lora_data['tags'])
                     for tag in lora_data['tags']:
-                        self._tags_count[tag] = self._tags_count.get(tag, 0) + 1
-            
+                        self._tags_to_items.setdefault(tag, set()).add(item_id)
+
+                if idx & 0xFF == 0:
+                    await asyncio.sleep(0)
+
             # Update cache
             self._cache = LoraCache(
                 raw_data=raw_data,
@@ -124,7 +161,19 @@ class LoraScanner:
             # Call resort_cache to create sorted views
             await self._cache.resort()
 
+            # Resort stamped the lowercase search fields the index reads
+            self._rebuild_bigram_index(raw_data)
+
             self._initialization_task = None
+            self._cache_ready.set()
+
+            # Persist the fresh scan so the next startup is warm
+            await self.save_cache_snapshot()
+
+            # Enrich missing Civitai metadata in the background; the UI
+            # can already serve from the cache built above
+            if self._pending_metadata_fetches:
+                asyncio.create_task(self._drain_metadata_fetches())
             logger.info(f"LoRA Manager: Cache initialization completed in {time.time() - start_time:.2f} seconds, found {len(raw_data)} loras")
         except Exception as e:
             logger.error(f"LoRA Manager: Error initializing cache: {e}")
@@ -163,108 +212,177 @@ class LoraScanner:
                 'recursive': False
             }
 
-        # Get the base data set
-        filtered_data = cache.sorted_by_date if sort_by == 'date' else cache.sorted_by_name
-        
-        # Apply SFW filtering if enabled
-        if settings.get('show_only_sfw', False):
-            filtered_data = [
-                item for item in filtered_data
-                if not item.get('preview_nsfw_level') or item.get('preview_nsfw_level') < NSFW_LEVELS['R']
-            ]
-        
-        # Apply folder filtering
+        show_only_sfw = settings.get('show_only_sfw', False)
+
+        # Folder filtering goes through the per-view folder buckets so a
+        # folder-scoped browse costs O(result) instead of a full pass
         if folder is not None:
+            by_folder = cache.by_folder_date if sort_by == 'date' else cache.by_folder_name
             if search_options.get('recursive', False):
-                # Recursive mode: match all paths starting with this folder
-                filtered_data = [
-                    item for item in filtered_data 
-                    if item['folder'].startswith(folder + '/') or item['folder'] == folder
-                ]
+                # Recursive mode: the sorted folder list makes the
+                # subfolders a contiguous bisect range under folder + '/'
+                prefix = folder + '/'
+                lo = bisect_left(cache.folder_list, prefix)
+                hi = bisect_left(cache.folder_list, folder + chr(ord('/') + 1))
+                matched = cache.folder_list[lo:hi]
+                if folder in by_folder:
+                    matched.append(folder)
+                if len(matched) == 1:
+                    filtered_data = by_folder[matched[0]]
+                else:
+                    # Concatenating buckets would break the global sort
+                    # order, so fall back to one pass with set membership
+                    folder_set = set(matched)
+                    base = cache.sorted_by_date if sort_by == 'date' else cache.sorted_by_name
+                    filtered_data = [item for item in base if item['folder'] in folder_set]
             else:
                 # Non-recursive mode: match exact folder
-                filtered_data = [
-                    item for item in filtered_data 
-                    if item['folder'] == folder
-                ]
-        
-        # Apply base model filtering
+                filtered_data = by_folder.get(folder, [])
+            if show_only_sfw:
+                filtered_data = [item for item in filtered_data if _is_sfw(item)]
+        elif show_only_sfw:
+            # The SFW views are precomputed at resort time, so the filter
+            # costs a reference swap instead of an O(N) pass
+            filtered_data = cache.sorted_by_date_sfw if sort_by == 'date' else cache.sorted_by_name_sfw
+        else:
+            filtered_data = cache.sorted_by_date if sort_by == 'date' else cache.sorted_by_name
+
+        # Build the remaining filters as predicates so one streaming pass
+        # can count matches and keep just the requested page, instead of
+        # materializing a full intermediate list per filter
+        predicates = []
+
         if base_models and len(base_models) > 0:
-            filtered_data = [
-                item for item in filtered_data
-                if item.get('base_model') in base_models
-            ]
-        
-        # Apply tag filtering
+            base_model_set = set(base_models)
+            predicates.append(lambda item: item.get('base_model') in base_model_set)
+
+        # Tag filtering via the inverted index: membership is one set
+        # lookup per item instead of scanning each item's tag list
         if tags and len(tags) > 0:
-            filtered_data = [
-                item for item in filtered_data
-                if any(tag in item.get('tags', []) for tag in tags)
-            ]
-        
-        # Apply search filtering
+            hit_ids = set()
+            for tag in tags:
+                hit_ids |= self._tags_to_items.get(tag, set())
+            predicates.append(lambda item: id(item) in hit_ids)
+
         if search:
-            search_results = []
-            for item in filtered_data:
-                # Check filename if enabled
-                if search_options.get('filename', True):
-                    if fuzzy:
-                        if fuzzy_match(item.get('file_name', ''), search):
-                            search_results.append(item)
-                            continue
-                    else:
-                        if search.lower() in item.get('file_name', '').lower():
-                            search_results.append(item)
-                            continue
-                            
-                # Check model name if enabled
-                if search_options.get('modelname', True):
-                    if fuzzy:
-                        if fuzzy_match(item.get('model_name', ''), search):
-                            search_results.append(item)
-                            continue
-                    else:
-                        if search.lower() in item.get('model_name', '').lower():
-                            search_results.append(item)
-                            continue
-                            
-                # Check tags if enabled
-                if search_options.get('tags', False) and item.get('tags'):
-                    found_tag = False
-                    for tag in item['tags']:
-                        if fuzzy:
+            # Lowercase once and hoist the option lookups out of the loop;
+            # items carry precomputed _name_lc/_model_lc/_tags_lc fields
+            search_lower = search.lower()
+            check_filename = search_options.get('filename', True)
+            check_modelname = search_options.get('modelname', True)
+            check_tags = search_options.get('tags', False)
+            # Fuzzy queries first shrink to items sharing the query's
+            # bigrams so the scorer only runs on plausible candidates
+            candidates = self._fuzzy_candidates(search_lower) if fuzzy else None
+
+            # Two specialized closures so the hot loop never re-tests the
+            # fuzzy flag per item
+            if fuzzy:
+                def matches_search(item):
+                    if candidates is not None and item['file_path'] not in candidates:
+                        return False
+                    # Check filename if enabled
+                    if check_filename and fuzzy_match(item.get('file_name', ''), search):
+                        return True
+                    # Check model name if enabled
+                    if check_modelname and fuzzy_match(item.get('model_name', ''), search):
+                        return True
+                    # Check tags if enabled
+                    if check_tags:
+                        for tag in item['_tags_lc']:
                             if fuzzy_match(tag, search):
-                                found_tag = True
-                                break
-                        else:
-                            if search.lower() in tag.lower():
-                                found_tag = True
-                                break
-                    if found_tag:
-                        search_results.append(item)
-                        continue
-                        
-            filtered_data = search_results
+                                return True
+                    return False
+            else:
+                def matches_search(item):
+                    # Check filename if enabled
+                    if check_filename and search_lower in item['_name_lc']:
+                        return True
+                    # Check model name if enabled
+                    if check_modelname and search_lower in item['_model_lc']:
+                        return True
+                    # Check tags if enabled
+                    if check_tags:
+                        for tag in item['_tags_lc']:
+                            if search_lower in tag:
+                                return True
+                    return False
+
+            predicates.append(matches_search)
 
         # Calculate pagination
-        total_items = len(filtered_data)
         start_idx = (page - 1) * page_size
-        end_idx = min(start_idx + page_size, total_items)
-        
+        end_idx = start_idx + page_size
+
+        if predicates:
+            # Single pass: count every match for the total, but only the
+            # page window is ever collected
+            total_items = 0
+            items = []
+            for item in filtered_data:
+                for predicate in predicates:
+                    if not predicate(item):
+                        break
+                else:
+                    if start_idx <= total_items < end_idx:
+                        items.append(item)
+                    total_items += 1
+        else:
+            total_items = len(filtered_data)
+            items = filtered_data[start_idx:min(end_idx, total_items)]
+
         result = {
-            'items': filtered_data[start_idx:end_idx],
+            'items': items,
             'total': total_items,
             'page': page,
             'page_size': page_size,
             'total_pages': (total_items + page_size - 1) // page_size
         }
-        
+
         return result
 
     def invalidate_cache(self):
         """Invalidate the current cache"""
         self._cache = None
 
+    def _rebuild_bigram_index(self, raw_data: List[Dict]) -> None:
+        """Rebuild the bigram index over each item's search fields
+
+        Maps every 2-gram of the lowercase name, model name and tags to
+        the owning file_path so fuzzy search can intersect the query's
+        bigrams instead of scoring the whole library.
+        """
+        index = {}
+        for item in raw_data:
+            file_path = item['file_path']
+            bigrams = set()
+            for text in (item['_name_lc'], item['_model_lc'], *item['_tags_lc']):
+                for i in range(len(text) - 1):
+                    bigrams.add(text[i:i + 2])
+            for bigram in bigrams:
+                index.setdefault(bigram, set()).add(file_path)
+        self._bigram_index = index
+
+    def _fuzzy_candidates(self, search_lower: str) -> Optional[set]:
+        """Intersect the query's bigrams against the index
+
+        Returns the set of candidate file_paths, or None when the index
+        can't narrow the query (no index yet, or only very short words
+        where transpositions defeat bigram overlap).
+        """
+        if not self._bigram_index:
+            return None
+        candidates = None
+        for word in search_lower.split():
+            if len(word) < 3:
+                continue  # too short for a reliable bigram signal
+            hits = set()
+            for i in range(len(word) - 1):
+                hits |= self._bigram_index.get(word[i:i + 2], frozenset())
+            # fuzzy_match requires every word to match, so intersect
+            candidates = hits if candidates is None else candidates & hits
+        return candidates
+
     async def scan_all_loras(self) -> List[Dict]:
         """Scan all LoRA directories and return metadata"""
         all_loras = []
@@ -284,51 +402,154 @@ class LoraScanner:
                 
         return all_loras
 
-    async def _scan_directory(self, root_path: str) -> List[Dict]:
-        """Scan a single directory for LoRA files"""
+    @staticmethod
+    def _list_directory(path: str):
+        """Blocking scandir pass splitting a directory into loras and subdirs
+
+        Runs in a worker thread so the stat calls behind is_file/is_dir
+        (expensive on network shares) never block the event loop.
+        """
+        lora_files, subdirs = [], []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # Suffix first: it's a free string check, and most
+                    # entries (previews, sidecar json) fail it without
+                    # ever touching the DirEntry type info
+                    if entry.name.endswith('.safetensors'):
+                        if entry.is_file(follow_symlinks=True):
+                            # stat() reuses the result cached by is_file
+                            lora_files.append((entry.path, entry.stat()))
+                    elif entry.is_dir(follow_symlinks=False) or \
+                            (entry.is_symlink() and entry.is_dir(follow_symlinks=True)):
+                        # Non-symlink checks read the cached d_type; only
+                        # symlinked directories pay a stat here
+                        subdirs.append((entry.path, entry.is_symlink()))
+                except OSError as e:
+                    logger.error(f"Error processing entry {entry.path}: {e}")
+        return lora_files, subdirs
+
+    async def _scan_directory(self, root_path: str, max_workers: int = 8) -> List[Dict]:
+        """Scan a single directory for LoRA files
+
+        Directories are fed through a queue to a small pool of workers so
+        several scandir calls can be in flight at once; on network shares
+        each call blocks for a round trip, and serial traversal would pay
+        that latency per directory.
+        """
         loras = []
         original_root = root_path  # 保存原始根路径
-        
-        async def scan_recursive(path: str, visited_paths: set):
-            """递归扫描目录，避免循环链接"""
-            try:
-                real_path = os.path.realpath(path)
-                if real_path in visited_paths:
-                    logger.debug(f"Skipping already visited path: {path}")
-                    return
-                visited_paths.add(real_path)
-                
-                with os.scandir(path) as it:
-                    entries = list(it)
-                    for entry in entries:
-                        try:
-                            if entry.is_file(follow_symlinks=True) and entry.name.endswith('.safetensors'):
-                                # 使用原始路径而不是真实路径
-                                file_path = entry.path.replace(os.sep, "/")
-                                await self._process_single_file(file_path, original_root, loras)
-                                await asyncio.sleep(0)
-                            elif entry.is_dir(follow_symlinks=True):
-                                # 对于目录，使用原始路径继续扫描
-                                await scan_recursive(entry.path, visited_paths)
-                        except Exception as e:
-                            logger.error(f"Error processing entry {entry.path}: {e}")
-            except Exception as e:
-                logger.error(f"Error scanning {path}: {e}")
+        # Only touched between awaits on the event loop, so no lock needed
+        visited_paths = set()
+
+        # Canonicalize the root once; any directory reached without
+        # crossing a symlink has realpath == canonical root + suffix,
+        # so recording it needs no further syscalls
+        root_real = await asyncio.to_thread(os.path.realpath, root_path)
+        root_len = len(root_path)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait((root_path, False))
+
+        async def worker():
+            while True:
+                path, in_symlink_tree = await queue.get()
+                try:
+                    # 避免循环链接 - only subtrees reached through a symlink
+                    # can revisit a directory, so plain trees skip the
+                    # realpath syscall entirely
+                    if in_symlink_tree:
+                        real_path = await asyncio.to_thread(os.path.realpath, path)
+                        if real_path in visited_paths:
+                            logger.debug(f"Skipping already visited path: {path}")
+                            continue
+                        visited_paths.add(real_path)
+                    else:
+                        # Record the plain directory so a symlink pointing
+                        # back into it is detected as a revisit
+                        visited_paths.add(root_real + path[root_len:])
+
+                    lora_files, subdirs = await asyncio.to_thread(self._list_directory, path)
+                    for subdir, is_symlink in subdirs:
+                        # 对于目录，使用原始路径继续扫描
+                        queue.put_nowait((subdir, in_symlink_tree or is_symlink))
+                    for file_path, stat_result in lora_files:
+                        # 使用原始路径而不是真实路径
+                        await self._process_single_file(file_path.replace(os.sep, "/"), original_root, loras, stat_result)
+                except Exception as e:
+                    logger.error(f"Error scanning {path}: {e}")
+                finally:
+                    queue.task_done()
 
-        await scan_recursive(root_path, set())
+        workers = [asyncio.create_task(worker()) for _ in range(max_workers)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         return loras
 
-    async def _process_single_file(self, file_path: str, root_path: str, loras: list):
+    async def _process_single_file(self, file_path: str, root_path: str, loras: list, stat_result=None):
         """处理单个文件并添加到结果列表"""
         try:
-            result = await self._process_lora_file(file_path, root_path)
+            result = await self._process_lora_file(file_path, root_path, stat_result)
             if result:
                 loras.append(result)
         except Exception as e:
             logger.error(f"Error processing {file_path}: {e}")
 
-    async def _process_lora_file(self, file_path: str, root_path: str) -> Dict:
+    @property
+    def _snapshot_path(self) -> str:
+        """Path of the persisted cache snapshot"""
+        return os.path.join(config.loras_roots[0], '.loras_cache.json') if config.loras_roots else ''
+
+    async def _load_snapshot_entries(self) -> Dict[str, Dict]:
+        """Load the cache persisted by the previous run, keyed by file_path
+
+        Entries are only reused for files whose size and mtime still
+        match, so stale metadata never survives a rescan.
+        """
+        snapshot_path = self._snapshot_path
+        if not snapshot_path or not os.path.exists(snapshot_path):
+            return {}
+        try:
+            raw = await asyncio.to_thread(read_json_file, snapshot_path)
+            if not isinstance(raw, list):
+                return {}
+            return {entry['file_path']: entry for entry in raw if 'file_path' in entry}
+        except Exception as e:
+            logger.error(f"Error loading lora cache snapshot: {e}")
+            return {}
+
+    async def save_cache_snapshot(self):
+        """Persist the cache so the next startup mostly skips metadata reads"""
+        if self._cache is None or not self._snapshot_path:
+            return
+        try:
+            await asyncio.to_thread(write_json_file, self._snapshot_path, self._cache.raw_data)
+        except Exception as e:
+            logger.error(f"Error saving lora cache snapshot: {e}")
+
+    async def _process_lora_file(self, file_path: str, root_path: str, stat_result=None) -> Dict:
         """Process a single LoRA file and return its metadata"""
+        # Reuse the previous run's entry when the file is unchanged; the
+        # scan's cached stat (or one fresh stat) replaces reading the
+        # sidecar metadata file
+        cached = self._snapshot_entries.get(file_path)
+        if cached is not None:
+            try:
+                if stat_result is None:
+                    stat_result = await asyncio.to_thread(os.stat, file_path)
+                if (stat_result.st_size == cached.get('size')
+                        and stat_result.st_mtime == cached.get('modified')):
+                    if self._needs_civitai_metadata(cached):
+                        self._pending_metadata_fetches.append((file_path, cached))
+                    cached['folder'] = self._relative_folder(file_path, root_path)
+                    return cached
+            except OSError:
+                pass
+
         # Try loading existing metadata
         metadata = await load_metadata(file_path)
         
@@ -337,8 +558,7 @@ class LoraScanner:
             civitai_info_path = f"{os.path.splitext(file_path)[0]}.civitai.info"
             if os.path.exists(civitai_info_path):
                 try:
-                    with open(civitai_info_path, 'r', encoding='utf-8') as f:
-                        version_info = json.load(f)
+                    version_info = read_json_file(civitai_info_path)
                     
                     file_info = next((f for f in version_info.get('files', []) if f.get('primary')), None)
                     if file_info:
@@ -356,18 +576,85 @@ class LoraScanner:
             
             # If still no metadata, create new metadata using get_file_info
             if metadata is None:
-                metadata = await get_file_info(file_path)
+                metadata = await get_file_info(file_path, stat_result)
         
         # Convert to dict and add folder info
         lora_data = metadata.to_dict()
-        # Try to fetch missing metadata from Civitai if needed
-        await self._fetch_missing_metadata(file_path, lora_data)
-        rel_path = os.path.relpath(file_path, root_path)
-        folder = os.path.dirname(rel_path)
-        lora_data['folder'] = folder.replace(os.path.sep, '/')
-        
+        # Defer Civitai enrichment so the scan itself stays off the network
+        if self._needs_civitai_metadata(lora_data):
+            self._pending_metadata_fetches.append((file_path, lora_data))
+        lora_data['folder'] = self._relative_folder(file_path, root_path)
+
         return lora_data
             
+    @staticmethod
+    def _needs_civitai_metadata(lora_data: Dict) -> Optional[str]:
+        """Return the Civitai model ID when tags or description are missing
+
+        Args:
+            lora_data: Lora metadata dictionary to inspect
+
+        Returns:
+            The model ID as a string when a fetch is warranted, else None
+        """
+        # Skip if already marked as deleted on Civitai
+        if lora_data.get('civitai_deleted', False):
+            return None
+
+        if not lora_data.get('civitai'):
+            return None
+
+        # Try to get model ID directly from the correct location
+        model_id = lora_data['civitai'].get('modelId')
+        if not model_id:
+            return None
+
+        # Check if tags are missing or empty
+        tags_missing = not lora_data.get('tags') or len(lora_data.get('tags', [])) == 0
+
+        # Check if description is missing or empty
+        desc_missing = not lora_data.get('modelDescription') or lora_data.get('modelDescription') in (None, "")
+
+        return str(model_id) if (tags_missing or desc_missing) else None
+
+    async def _drain_metadata_fetches(self) -> None:
+        """Fetch deferred Civitai metadata once the cache is serving
+
+        Runs as a background task with bounded parallelism; the cached
+        dicts are updated in place, so a single resort at the end brings
+        the derived views, tag counts and bigram index up to date.
+        """
+        pending, self._pending_metadata_fetches = self._pending_metadata_fetches, []
+        if not pending:
+            return
+        semaphore = asyncio.Semaphore(8)
+
+        async def fetch_one(file_path, lora_data):
+            async with semaphore:
+                await self._fetch_missing_metadata(file_path, lora_data)
+
+        try:
+            await asyncio.gather(*(fetch_one(fp, ld) for fp, ld in pending))
+
+            cache = self._cache
+            if cache is not None:
+                # Rebuild tag structures from scratch; fetches may have added tags
+                tags_count = Counter()
+                tags_to_items = {}
+                for lora_data in cache.raw_data:
+                    item_id = id(lora_data)
+                    tags = lora_data.get('tags') or ()
+                    tags_count.update(tags)
+                    for tag in tags:
+                        tags_to_items.setdefault(tag, set()).add(item_id)
+                self._tags_count = tags_count
+                self._tags_to_items = tags_to_items
+                await cache.resort()
+                self._rebuild_bigram_index(cache.raw_data)
+            logger.info(f"LoRA Manager: Refreshed Civitai metadata for {len(pending)} loras")
+        except Exception as e:
+            logger.error(f"Error refreshing Civitai metadata: {e}", exc_info=True)
+
     async def _fetch_missing_metadata(self, file_path: str, lora_data: Dict) -> None:
         """Fetch missing description and tags from Civitai if needed
         
@@ -376,39 +663,14 @@ class LoraScanner:
             lora_data: Lora metadata dictionary to update
         """
         try:
-            # Skip if already marked as deleted on Civitai
-            if lora_data.get('civitai_deleted', False):
-                logger.debug(f"Skipping metadata fetch for {file_path}: marked as deleted on Civitai")
-                return
-
-            # Check if we need to fetch additional metadata from Civitai
-            needs_metadata_update = False
-            model_id = None
-            
-            # Check if we have Civitai model ID but missing metadata
-            if lora_data.get('civitai'):
-                # Try to get model ID directly from the correct location
-                model_id = lora_data['civitai'].get('modelId')
-                
-                if model_id:
-                    model_id = str(model_id)
-                    # Check if tags are missing or empty
-                    tags_missing = not lora_data.get('tags') or len(lora_data.get('tags', [])) == 0
-                    
-                    # Check if description is missing or empty
-                    desc_missing = not lora_data.get('modelDescription') or lora_data.get('modelDescription') in (None, "")
-                    
-                    needs_metadata_update = tags_missing or desc_missing
-            
-            # Fetch missing metadata if needed
-            if needs_metadata_update and model_id:
+            model_id = self._needs_civitai_metadata(lora_data)
+            if model_id:
                 logger.debug(f"Fetching missing metadata for {file_path} with model ID {model_id}")
-                from ..services.civitai_client import CivitaiClient
+                # Singleton: all fetches share one pooled keep-alive session
                 client = CivitaiClient()
                 
                 # Get metadata and status code
                 model_metadata, status_code = await client.get_model_metadata(model_id)
-                await client.close()
                 
                 # Handle 404 status (model deleted from Civitai)
                 if status_code == 404:
@@ -417,10 +679,8 @@ class LoraScanner:
                     lora_data['civitai_deleted'] = True
                     
                     # Save the updated metadata back to file
-                    metadata_path = os.path.splitext(file_path)[0] + '.metadata.json'
-                    with open(metadata_path, 'w', encoding='utf-8') as f:
-                        json.dump(lora_data, f, indent=2, ensure_ascii=False)
-                
+                    self._save_lora_metadata(file_path, lora_data)
+
                 # Process valid metadata if available
                 elif model_metadata:
                     logger.debug(f"Updating metadata for {file_path} with model ID {model_id}")
@@ -434,12 +694,23 @@ class LoraScanner:
                         lora_data['modelDescription'] = model_metadata['description']
                     
                     # Save the updated metadata back to file
-                    metadata_path = os.path.splitext(file_path)[0] + '.metadata.json'
-                    with open(metadata_path, 'w', encoding='utf-8') as f:
-                        json.dump(lora_data, f, indent=2, ensure_ascii=False)
+                    self._save_lora_metadata(file_path, lora_data)
         except Exception as e:
             logger.error(f"Failed to update metadata from Civitai for {file_path}: {e}")
 
+    @staticmethod
+    def _save_lora_metadata(file_path: str, lora_data: Dict) -> None:
+        """Write a cached lora entry back to its .metadata.json sidecar
+
+        Cache-only keys (folder, the precomputed lowercase search fields)
+        are stripped so they never end up on disk.
+        """
+        metadata_path = os.path.splitext(file_path)[0] + '.metadata.json'
+        write_json_file(metadata_path, {
+            k: v for k, v in lora_data.items()
+            if k != 'folder' and not k.startswith('_')
+        })
+
     async def update_preview_in_cache(self, file_path: str, preview_url: str) -> bool:
         """Update preview URL in cache for a specific lora
         
@@ -478,13 +749,24 @@ class LoraScanner:
             logger.error(f"Error scanning {file_path}: {e}")
             return None
     
+    @staticmethod
+    def _relative_folder(file_path: str, root: str) -> str:
+        """Folder of file_path relative to root, with forward slashes
+
+        Pure string slicing - file_path is known to sit under root, so
+        the normalize/split/rejoin work os.path.relpath does per call is
+        unnecessary.
+        """
+        rel = file_path[len(root):].lstrip('/\\').replace('\\', '/')
+        i = rel.rfind('/')
+        return rel[:i] if i >= 0 else ''
+
     def _calculate_folder(self, file_path: str) -> str:
         """Calculate the folder path for a LoRA file"""
         # 使用原始路径计算相对路径
         for root in config.loras_roots:
             if file_path.startswith(root):
-                rel_path = os.path.relpath(file_path, root)
-                return os.path.dirname(rel_path).replace(os.path.sep, '/')
+                return self._relative_folder(file_path, root)
         return ''
 
     async def move_model(self, source_path: str, target_path: str) -> bool:
@@ -549,65 +831,73 @@ class LoraScanner:
         
     async def update_single_lora_cache(self, original_path: str, new_path: str, metadata: Dict) -> bool:
         cache = await self.get_cached_data()
-        
-        # Find the existing item to remove its tags from count
-        existing_item = next((item for item in cache.raw_data if item['file_path'] == original_path), None)
+
+        # The library changed, so cached negative name lookups may be stale
+        self._missing_names.clear()
+
+        # Find the existing item via the path index to remove its tags
+        # from count and index
+        existing_idx = cache.by_path.get(original_path)
+        existing_item = cache.raw_data[existing_idx] if existing_idx is not None else None
         if existing_item and 'tags' in existing_item:
+            existing_id = id(existing_item)
             for tag in existing_item.get('tags', []):
                 if tag in self._tags_count:
                     self._tags_count[tag] = max(0, self._tags_count[tag] - 1)
                     if self._tags_count[tag] == 0:
                         del self._tags_count[tag]
+                items = self._tags_to_items.get(tag)
+                if items is not None:
+                    items.discard(existing_id)
+                    if not items:
+                        del self._tags_to_items[tag]
         
         # Remove old path from hash index if exists
         self._hash_index.remove_by_path(original_path)
         
-        # Remove the old entry from raw_data
-        cache.raw_data = [
-            item for item in cache.raw_data 
-            if item['file_path'] != original_path
-        ]
-        
+        # Remove the old entry with a swap-pop; raw_data is an unordered
+        # backing store and the resort below rebuilds the sorted views
+        if existing_idx is not None:
+            last_item = cache.raw_data[-1]
+            cache.raw_data[existing_idx] = last_item
+            cache.by_path[last_item['file_path']] = existing_idx
+            cache.raw_data.pop()
+            cache.by_path.pop(original_path, None)
+
         if metadata:
             # If this is an update to an existing path (not a move), ensure folder is preserved
-            if original_path == new_path:
-                # Find the folder from existing entries or calculate it
-                existing_folder = next((item['folder'] for item in cache.raw_data 
-                                      if item['file_path'] == original_path), None)
-                if existing_folder:
-                    metadata['folder'] = existing_folder
-                else:
-                    metadata['folder'] = self._calculate_folder(new_path)
+            if original_path == new_path and existing_item is not None and existing_item.get('folder'):
+                metadata['folder'] = existing_item['folder']
             else:
                 # For moved files, recalculate the folder
                 metadata['folder'] = self._calculate_folder(new_path)
-            
+
             # Add the updated metadata to raw_data
             cache.raw_data.append(metadata)
+            cache.by_path[new_path] = len(cache.raw_data) - 1
             
             # Update hash index with new path
             if 'sha256' in metadata:
-                self._hash_index.add_entry(metadata['sha256'].lower(), new_path)
-            
-            # Update folders list
-            all_folders = set(item['folder'] for item in cache.raw_data)
-            cache.folders = sorted(list(all_folders), key=lambda x: x.lower())
-            
-            # Update tags count with the new/updated tags
+                self._hash_index.add_entry(metadata['sha256'], new_path)
+
+            # Update tags count and index with the new/updated tags
             if 'tags' in metadata:
+                item_id = id(metadata)
                 for tag in metadata.get('tags', []):
-                    self._tags_count[tag] = self._tags_count.get(tag, 0) + 1
+                    self._tags_count[tag] += 1
+                    self._tags_to_items.setdefault(tag, set()).add(item_id)
         
         # Resort cache
         await cache.resort()
-        
+
+        self._rebuild_bigram_index(cache.raw_data)
+
         return True
 
     async def _update_metadata_paths(self, metadata_path: str, lora_path: str) -> Dict:
         """Update file paths in metadata file"""
         try:
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = read_json_file(metadata_path)
             
             # Update file_path
             metadata['file_path'] = lora_path.replace(os.sep, '/')
@@ -621,8 +911,7 @@ class LoraScanner:
                 metadata['preview_url'] = new_preview_path.replace(os.sep, '/')
             
             # Save updated metadata
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            write_json_file(metadata_path, metadata)
 
             return metadata
                 
@@ -632,11 +921,11 @@ class LoraScanner:
     # Add new methods for hash index functionality
     def has_lora_hash(self, sha256: str) -> bool:
         """Check if a LoRA with given hash exists"""
-        return self._hash_index.has_hash(sha256.lower())
+        return self._hash_index.has_hash(sha256)
         
     def get_lora_path_by_hash(self, sha256: str) -> Optional[str]:
         """Get file path for a LoRA by its hash"""
-        return self._hash_index.get_path(sha256.lower())
+        return self._hash_index.get_path(sha256)
         
     def get_lora_hash_by_path(self, file_path: str) -> Optional[str]:
         """Get hash for a LoRA by its file path"""
@@ -645,7 +934,7 @@ class LoraScanner:
     def get_preview_url_by_hash(self, sha256: str) -> Optional[str]:
         """Get preview static URL for a LoRA by its hash"""
         # Get the file path first
-        file_path = self._hash_index.get_path(sha256.lower())
+        file_path = self._hash_index.get_path(sha256)
         if not file_path:
             return None
             
@@ -675,15 +964,8 @@ class LoraScanner:
         # Make sure cache is initialized
         await self.get_cached_data()
         
-        # Sort tags by count in descending order
-        sorted_tags = sorted(
-            [{"tag": tag, "count": count} for tag, count in self._tags_count.items()],
-            key=lambda x: x['count'],
-            reverse=True
-        )
-        
-        # Return limited number
-        return sorted_tags[:limit]
+        # most_common sorts (and heap-selects for small limits) in C
+        return [{"tag": tag, "count": count} for tag, count in self._tags_count.most_common(limit)]
         
     async def get_base_models(self, limit: int = 20) -> List[Dict[str, any]]:
         """Get base models used in loras sorted by frequency
@@ -712,51 +994,63 @@ class LoraScanner:
         return sorted_models[:limit]
 
     async def diagnose_hash_index(self):
-        """Diagnostic method to verify hash index functionality"""
-        print("\n\n*** DIAGNOSING LORA HASH INDEX ***\n\n", file=sys.stderr)
-        
+        """Diagnostic method to verify hash index functionality
+
+        Only runs when debug logging is enabled, so a stray production
+        call costs one level check instead of formatting sample entries.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        logger.debug("*** DIAGNOSING LORA HASH INDEX ***")
+
         # First check if the hash index has any entries
-        if hasattr(self, '_hash_index'):
-            index_entries = len(self._hash_index._hash_to_path)
-            print(f"Hash index has {index_entries} entries", file=sys.stderr)
-            
-            # Print a few example entries if available
-            if index_entries > 0:
-                print("\nSample hash index entries:", file=sys.stderr)
-                count = 0
-                for hash_val, path in self._hash_index._hash_to_path.items():
-                    if count < 5:  # Just show the first 5
-                        print(f"Hash: {hash_val[:8]}... -> Path: {path}", file=sys.stderr)
-                        count += 1
-                    else:
-                        break
-        else:
-            print("Hash index not initialized", file=sys.stderr)
-        
+        if not hasattr(self, '_hash_index'):
+            logger.debug("Hash index not initialized")
+            return
+
+        hash_to_path = self._hash_index._hash_to_path
+        logger.debug(f"Hash index has {len(hash_to_path)} entries")
+
+        # Show a few example entries without walking the whole dict
+        for hash_val, path in islice(hash_to_path.items(), 5):
+            logger.debug(f"Hash: {hash_val[:8]}... -> Path: {path}")
+
         # Try looking up by a known hash for testing
-        if not hasattr(self, '_hash_index') or not self._hash_index._hash_to_path:
-            print("No hash entries to test lookup with", file=sys.stderr)
+        if not hash_to_path:
+            logger.debug("No hash entries to test lookup with")
             return
-        
-        test_hash = next(iter(self._hash_index._hash_to_path.keys()))
+
+        test_hash = next(iter(hash_to_path))
         test_path = self._hash_index.get_path(test_hash)
-        print(f"\nTest lookup by hash: {test_hash[:8]}... -> {test_path}", file=sys.stderr)
-        
+        logger.debug(f"Test lookup by hash: {test_hash[:8]}... -> {test_path}")
+
         # Also test reverse lookup
         test_hash_result = self._hash_index.get_hash(test_path)
-        print(f"Test reverse lookup: {test_path} -> {test_hash_result[:8]}...\n\n", file=sys.stderr)
+        logger.debug(f"Test reverse lookup: {test_path} -> {test_hash_result[:8]}...")
 
     async def get_lora_info_by_name(self, name):
         """Get LoRA information by name"""
         try:
+            # Names already known to be missing don't need another scan
+            if name in self._missing_names:
+                self._missing_names.move_to_end(name)
+                return None
+
             # Get cached data
             cache = await self.get_cached_data()
             
-            # Find the LoRA by name
-            for lora in cache.raw_data:
-                if lora.get("file_name") == name:
-                    return lora
-                    
+            # Find the LoRA by name via the cache's name index
+            lora = cache.by_filename.get(name)
+            if lora is not None:
+                return lora
+
+            # Only record the miss against a populated cache; an empty
+            # placeholder during startup would poison the cache
+            if self._cache is not None:
+                self._missing_names[name] = True
+                if len(self._missing_names) > 4096:
+                    self._missing_names.popitem(last=False)
             return None
         except Exception as e:
             logger.error(f"Error getting LoRA info by name: {e}", exc_info=True)
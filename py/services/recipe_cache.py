@@ -1,4 +1,5 @@
 import asyncio
+from collections import Counter
 from typing import List, Dict
 from dataclasses import dataclass
 from operator import itemgetter
@@ -12,20 +13,81 @@ class RecipeCache:
     
     def __post_init__(self):
         self._lock = asyncio.Lock()
+        # Bumped on every mutation; lets the API emit cheap ETags
+        self._version = 0
+        # id -> recipe index for O(1) lookups on detail/share/delete paths
+        self._by_id = {str(recipe.get('id', '')): recipe for recipe in self.raw_data}
+        # Incrementally maintained aggregations for the filter endpoints
+        self._tag_counter = Counter()
+        self._base_model_counter = Counter()
+        self._rebuild_counters()
+
+    def get_recipe_by_id(self, recipe_id: str) -> Dict:
+        """Get a recipe by its ID in O(1)"""
+        return self._by_id.get(str(recipe_id))
+
+    def _rebuild_counters(self):
+        """Rebuild tag and base model counters from raw_data"""
+        tag_counter = Counter()
+        base_model_counter = Counter()
+        for recipe in self.raw_data:
+            tag_counter.update(recipe.get('tags') or [])
+            base_model = recipe.get('base_model')
+            if base_model:
+                base_model_counter[base_model] += 1
+        self._tag_counter = tag_counter
+        self._base_model_counter = base_model_counter
+
+    def count_recipe(self, recipe: Dict):
+        """Add a recipe's tags and base model to the counters"""
+        self._tag_counter.update(recipe.get('tags') or [])
+        base_model = recipe.get('base_model')
+        if base_model:
+            self._base_model_counter[base_model] += 1
+
+    def discount_recipe(self, recipe: Dict):
+        """Remove a recipe's tags and base model from the counters"""
+        for tag in recipe.get('tags') or []:
+            if self._tag_counter[tag] > 1:
+                self._tag_counter[tag] -= 1
+            else:
+                del self._tag_counter[tag]
+        base_model = recipe.get('base_model')
+        if base_model and base_model in self._base_model_counter:
+            if self._base_model_counter[base_model] > 1:
+                self._base_model_counter[base_model] -= 1
+            else:
+                del self._base_model_counter[base_model]
 
     async def resort(self, name_only: bool = False):
         """Resort all cached data views"""
         async with self._lock:
-            self.sorted_by_name = sorted(
-                self.raw_data, 
-                key=lambda x: x.get('title', '').lower()  # Case-insensitive sort
+            self._resort_sync(name_only)
+
+    def _resort_sync(self, name_only: bool = False):
+        """Synchronous resort body; callers must hold the cache lock
+
+        The work here is pure CPU with no awaits, so there is no reason
+        to pay asyncio scheduling overhead inside the critical section.
+        """
+        # Stamp the lowercase sort key once per item so the sort does
+        # N .lower() calls instead of N log N through a lambda
+        for recipe in self.raw_data:
+            recipe['_title_key'] = recipe.get('title', '').lower()
+        self.sorted_by_name = sorted(
+            self.raw_data,
+            key=itemgetter('_title_key')  # Case-insensitive sort
+        )
+        if not name_only:
+            self.sorted_by_date = sorted(
+                self.raw_data,
+                key=itemgetter('created_date', 'file_path'),
+                reverse=True
             )
-            if not name_only:
-                self.sorted_by_date = sorted(
-                    self.raw_data, 
-                    key=itemgetter('created_date', 'file_path'), 
-                    reverse=True
-                )
+        # Keep the id index and aggregations in sync with raw_data
+        self._by_id = {str(recipe.get('id', '')): recipe for recipe in self.raw_data}
+        self._rebuild_counters()
+        self._version += 1
     
     async def update_recipe_metadata(self, recipe_id: str, metadata: Dict) -> bool:
         """Update metadata for a specific recipe in all cached data
@@ -38,27 +100,74 @@ class RecipeCache:
             bool: True if the update was successful, False if the recipe wasn't found
         """
         async with self._lock:
-            # Update in raw_data
-            for item in self.raw_data:
-                if item.get('id') == recipe_id:
-                    item.update(metadata)
-                    break
-            else:
-                return False  # Recipe not found
-                
-            # Resort to reflect changes
-            await self.resort()
+            # Locate via the id index, then re-place the single entry in
+            # both sorted views instead of resorting everything. list
+            # removal compares by identity first, so the scans are cheap
+            recipe = self._by_id.get(str(recipe_id))
+            if recipe is None:
+                return False
+
+            self.sorted_by_name.remove(recipe)
+            self.sorted_by_date.remove(recipe)
+            self.discount_recipe(recipe)
+            recipe.update(metadata)
+            self._insert_by_name(recipe)
+            self._insert_by_date(recipe)
+            self.count_recipe(recipe)
+            self._version += 1
             return True
-            
+
+    def _insert_by_name(self, recipe: Dict) -> None:
+        """Binary-search insert into the ascending lowercased-title view
+
+        Restamps the item's sort key first, since an update may have
+        changed the title.
+        """
+        title_key = recipe['_title_key'] = recipe.get('title', '').lower()
+        lo, hi = 0, len(self.sorted_by_name)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.sorted_by_name[mid]['_title_key'] < title_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.sorted_by_name.insert(lo, recipe)
+
+    def _insert_by_date(self, recipe: Dict) -> None:
+        """Binary-search insert into the descending (date, path) view"""
+        date_key = (recipe.get('created_date', 0), recipe.get('file_path', ''))
+        lo, hi = 0, len(self.sorted_by_date)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item = self.sorted_by_date[mid]
+            if (item.get('created_date', 0), item.get('file_path', '')) > date_key:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.sorted_by_date.insert(lo, recipe)
+
+    def insert_sorted(self, recipe: Dict) -> None:
+        """Insert a single recipe without resorting the whole cache
+
+        Binary-searches both sorted views for the insertion point, so a
+        save costs O(log N) comparisons instead of an O(N log N) resort.
+        Keeps raw_data, the id index, the counters and the version in sync.
+        """
+        self.raw_data.append(recipe)
+        self._insert_by_name(recipe)
+        self._insert_by_date(recipe)
+        self._by_id[str(recipe.get('id', ''))] = recipe
+        self.count_recipe(recipe)
+        self._version += 1
+
     async def add_recipe(self, recipe_data: Dict) -> None:
         """Add a new recipe to the cache
-        
+
         Args:
             recipe_data: The recipe data to add
         """
         async with self._lock:
-            self.raw_data.append(recipe_data)
-            await self.resort() 
+            self.insert_sorted(recipe_data)
 
     async def remove_recipe(self, recipe_id: str) -> bool:
         """Remove a recipe from the cache by ID
@@ -69,17 +178,18 @@ class RecipeCache:
         Returns:
             bool: True if the recipe was found and removed, False otherwise
         """
-        # Find the recipe in raw_data
-        recipe_index = next((i for i, recipe in enumerate(self.raw_data) 
-                             if recipe.get('id') == recipe_id), None)
-        
-        if recipe_index is None:
-            return False
-        
-        # Remove from raw_data
-        self.raw_data.pop(recipe_index)
-        
-        # Resort to update sorted lists
-        await self.resort()
-        
-        return True 
\ No newline at end of file
+        async with self._lock:
+            # Find the recipe via the id index instead of scanning raw_data
+            recipe = self._by_id.get(str(recipe_id))
+            if recipe is None:
+                return False
+
+            try:
+                self.raw_data.remove(recipe)
+            except ValueError:
+                return False
+
+            # Resort to update sorted lists (also rebuilds the id index)
+            self._resort_sync()
+
+            return True
\ No newline at end of file
@@ -8,6 +8,7 @@ from .recipe_cache import RecipeCache
 from .lora_scanner import LoraScanner
 from .civitai_client import CivitaiClient
 from ..utils.utils import fuzzy_match
+from ..utils.json_utils import read_json_file, write_json_file
 import sys
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,7 @@ class RecipeScanner:
         # Ensure initialization only happens once
         if not hasattr(self, '_initialized'):
             self._cache: Optional[RecipeCache] = None
+            self._placeholder_cache: Optional[RecipeCache] = None
             self._initialization_lock = asyncio.Lock()
             self._initialization_task: Optional[asyncio.Task] = None
             self._is_initializing = False
@@ -50,15 +52,68 @@ class RecipeScanner:
         
         return recipes_dir
     
+    @property
+    def _snapshot_path(self) -> str:
+        """Path of the persisted cache snapshot"""
+        recipes_dir = self.recipes_dir
+        return os.path.join(recipes_dir, '.recipes_cache.json') if recipes_dir else ''
+
+    async def load_cache_snapshot(self) -> bool:
+        """Load the cache persisted at last shutdown, if any
+
+        Returns:
+            bool: True if a snapshot was loaded, so the full rescan can
+            happen in the background instead of blocking startup
+        """
+        snapshot_path = self._snapshot_path
+        if not snapshot_path or not os.path.exists(snapshot_path):
+            return False
+
+        try:
+            raw_data = await asyncio.to_thread(read_json_file, snapshot_path)
+            if not isinstance(raw_data, list):
+                return False
+
+            self._cache = RecipeCache(
+                raw_data=raw_data,
+                sorted_by_name=[],
+                sorted_by_date=[]
+            )
+            await self._cache.resort()
+            logger.info(f"Recipe Manager: loaded {len(raw_data)} recipes from cache snapshot")
+            return True
+        except Exception as e:
+            logger.error(f"Error loading recipe cache snapshot: {e}")
+            return False
+
+    async def save_cache_snapshot(self):
+        """Persist the current cache so the next startup skips the cold scan"""
+        if self._cache is None or not self._snapshot_path:
+            return
+        try:
+            await asyncio.to_thread(write_json_file, self._snapshot_path, self._cache.raw_data)
+        except Exception as e:
+            logger.error(f"Error saving recipe cache snapshot: {e}")
+
+    def _empty_cache(self) -> RecipeCache:
+        """Shared placeholder returned while initialization is in flight"""
+        if self._placeholder_cache is None:
+            self._placeholder_cache = RecipeCache(raw_data=[], sorted_by_name=[], sorted_by_date=[])
+        return self._placeholder_cache
+
     async def get_cached_data(self, force_refresh: bool = False) -> RecipeCache:
-        """Get cached recipe data, refresh if needed"""
+        """Get cached recipe data, refresh if needed
+
+        The warm path returns without awaiting anything - no lock, no
+        scheduler round-trip - so per-request overhead stays minimal.
+        """
         # If cache is already initialized and no refresh is needed, return it immediately
         if self._cache is not None and not force_refresh:
             return self._cache
 
         # If another initialization is already in progress, wait for it to complete
         if self._is_initializing and not force_refresh:
-            return self._cache or RecipeCache(raw_data=[], sorted_by_name=[], sorted_by_date=[])
+            return self._cache or self._empty_cache()
 
         # Try to acquire the lock with a timeout to prevent deadlocks
         try:
@@ -102,7 +157,7 @@ class RecipeScanner:
         
         except Exception as e:
             logger.error(f"Unexpected error in get_cached_data: {e}")
-            return self._cache or RecipeCache(raw_data=[], sorted_by_name=[], sorted_by_date=[])
+            return self._cache or self._empty_cache()
     
     async def scan_all_recipes(self) -> List[Dict]:
         """Scan all recipe JSON files and return metadata"""
@@ -122,19 +177,26 @@ class RecipeScanner:
                     if file.lower().endswith('.recipe.json'):
                         recipe_files.append(os.path.join(root, file))
         
-        # Process each recipe file
-        for recipe_path in recipe_files:
-            recipe_data = await self._load_recipe_file(recipe_path)
-            if recipe_data:
-                recipes.append(recipe_data)
-        
+        # Load recipe files with bounded concurrency; the blocking reads
+        # run in worker threads so a cold scan over a large library keeps
+        # the event loop responsive instead of awaiting one file at a time
+        semaphore = asyncio.Semaphore(8)
+
+        async def load_one(recipe_path: str) -> Optional[Dict]:
+            async with semaphore:
+                return await self._load_recipe_file(recipe_path)
+
+        results = await asyncio.gather(*(load_one(p) for p in recipe_files))
+        recipes.extend(r for r in results if r)
+
         return recipes
     
     async def _load_recipe_file(self, recipe_path: str) -> Optional[Dict]:
         """Load recipe data from a JSON file"""
         try:
-            with open(recipe_path, 'r', encoding='utf-8') as f:
-                recipe_data = json.load(f)
+            # Read and parse off the event loop; each file is small but a
+            # cold cache scan touches every recipe in the library
+            recipe_data = await asyncio.to_thread(read_json_file, recipe_path)
             
             # Validate recipe data
             if not recipe_data or not isinstance(recipe_data, dict):
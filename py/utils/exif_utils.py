@@ -1,5 +1,4 @@
 import piexif
-import json
 import logging
 from typing import Dict, Optional, Any
 from io import BytesIO
@@ -7,8 +6,14 @@ import os
 from PIL import Image
 import re
 
+from .json_utils import json_dumps_bytes, json_loads
+
 logger = logging.getLogger(__name__)
 
+# Recipe marker plus an optional ", " separator before it, up to the end
+# of its line; compiled once for remove_recipe_metadata
+_RECIPE_MARKER_RE = re.compile(r'(?:, )?Recipe metadata: [^\n]*')
+
 class ExifUtils:
     """Utility functions for working with EXIF data in images"""
     
@@ -103,48 +108,89 @@ class ExifUtils:
             logger.error(f"Error extracting image metadata: {e}", exc_info=True)
             return None
     
+    @staticmethod
+    def _load_exif_dict(image_path: str) -> Dict:
+        """Load a file's EXIF as a piexif dict, empty on failure"""
+        try:
+            exif_dict = piexif.load(image_path)
+        except Exception:
+            exif_dict = {'0th':{}, 'Exif':{}, 'GPS':{}, 'Interop':{}, '1st':{}}
+        if 'Exif' not in exif_dict:
+            exif_dict['Exif'] = {}
+        return exif_dict
+
+    @staticmethod
+    def _decode_user_comment(raw) -> Optional[str]:
+        """Decode a raw EXIF UserComment value to a string"""
+        if isinstance(raw, bytes):
+            if raw.startswith(b'UNICODE\0'):
+                return raw[8:].decode('utf-16be')
+            return raw.decode('utf-8', errors='ignore')
+        return raw
+
+    @staticmethod
+    def _insert_exif_dict(image_path: str, exif_dict: Dict) -> None:
+        """Write an EXIF dict back into a JPEG in place
+
+        piexif.insert rewrites only the APP1 segment, so the pixels are
+        never decoded or recompressed - orders of magnitude faster than a
+        full PIL re-save, and lossless.
+        """
+        piexif.insert(piexif.dump(exif_dict), image_path)
+
+    @staticmethod
+    def _insert_jpeg_user_comment(image_path: str, comment_bytes: bytes) -> None:
+        """Patch the UserComment into a JPEG's EXIF segment in place"""
+        exif_dict = ExifUtils._load_exif_dict(image_path)
+        exif_dict['Exif'][piexif.ExifIFD.UserComment] = comment_bytes
+        ExifUtils._insert_exif_dict(image_path, exif_dict)
+
     @staticmethod
     def update_user_comment(image_path: str, user_comment: str) -> str:
         """Update UserComment field in image EXIF data"""
         try:
-            # Load the image and its EXIF data
+            # Only sniff the format here; Image.open is lazy and doesn't
+            # decode pixels until they're needed
             with Image.open(image_path) as img:
-                # Get original format
                 img_format = img.format
-                
+
+            # Use UNICODE format for the comment
+            user_comment_bytes = b'UNICODE\0' + user_comment.encode('utf-16be')
+
+            # For JPEG, patch the EXIF segment without re-encoding pixels
+            if img_format == 'JPEG':
+                ExifUtils._insert_jpeg_user_comment(image_path, user_comment_bytes)
+                return image_path
+
+            with Image.open(image_path) as img:
                 # For WebP format, we need a different approach
                 if img_format == 'WEBP':
                     # WebP doesn't support standard EXIF through piexif
                     # We'll use PIL's exif parameter directly
-                    exif_dict = {'Exif': {piexif.ExifIFD.UserComment: b'UNICODE\0' + user_comment.encode('utf-16be')}}
-                    exif_bytes = piexif.dump(exif_dict)
-                    
+                    exif_bytes = piexif.dump({'Exif': {piexif.ExifIFD.UserComment: user_comment_bytes}})
+
                     # Save with the exif data
                     img.save(image_path, format='WEBP', exif=exif_bytes, quality=85)
                     return image_path
-                
+
                 # For other formats, use the standard approach
                 try:
                     exif_dict = piexif.load(img.info.get('exif', b''))
                 except:
                     exif_dict = {'0th':{}, 'Exif':{}, 'GPS':{}, 'Interop':{}, '1st':{}}
-                
+
                 # If no Exif dictionary exists, create one
                 if 'Exif' not in exif_dict:
                     exif_dict['Exif'] = {}
-                
-                # Update the UserComment field - use UNICODE format
-                unicode_bytes = user_comment.encode('utf-16be')
-                user_comment_bytes = b'UNICODE\0' + unicode_bytes
-                
+
                 exif_dict['Exif'][piexif.ExifIFD.UserComment] = user_comment_bytes
-                
+
                 # Convert EXIF dict back to bytes
                 exif_bytes = piexif.dump(exif_dict)
-                
+
                 # Save the image with updated EXIF data
                 img.save(image_path, exif=exif_bytes)
-                
+
             return image_path
         except Exception as e:
             logger.error(f"Error updating EXIF data in {image_path}: {e}")
@@ -165,7 +211,14 @@ class ExifUtils:
             # Load the image and check its format
             with Image.open(image_path) as img:
                 img_format = img.format
-                
+
+                # For JPEG, patch the EXIF segment in place instead of
+                # decoding and re-encoding the whole image
+                if img_format == 'JPEG':
+                    ExifUtils._insert_jpeg_user_comment(
+                        image_path, b'UNICODE\0' + metadata.encode('utf-16be'))
+                    return image_path
+
                 # For PNG, try to update parameters directly
                 if img_format == 'PNG':
                     # We'll save with parameters in the PNG info
@@ -210,79 +263,121 @@ class ExifUtils:
             logger.error(f"Error updating metadata in {image_path}: {e}")
             return image_path
             
+    @staticmethod
+    def _build_recipe_marker(recipe_data) -> str:
+        """Build the "Recipe metadata: ..." marker string for an image"""
+        # Prepare simplified loras data
+        simplified_loras = []
+        for lora in recipe_data.get("loras", []):
+            simplified_lora = {
+                "file_name": lora.get("file_name", ""),
+                "hash": lora.get("hash", "").lower() if lora.get("hash") else "",
+                "strength": float(lora.get("strength", 1.0)),
+                "modelVersionId": lora.get("modelVersionId", ""),
+                "modelName": lora.get("modelName", ""),
+                "modelVersionName": lora.get("modelVersionName", ""),
+            }
+            simplified_loras.append(simplified_lora)
+
+        # Create recipe metadata JSON
+        recipe_metadata = {
+            'title': recipe_data.get('title', ''),
+            'base_model': recipe_data.get('base_model', ''),
+            'loras': simplified_loras,
+            'gen_params': recipe_data.get('gen_params', {}),
+            'tags': recipe_data.get('tags', [])
+        }
+
+        # json_dumps_bytes uses orjson when available; large gen_params
+        # blocks serialize several times faster than through stdlib json
+        return f"Recipe metadata: {json_dumps_bytes(recipe_metadata).decode('utf-8')}"
+
+    @staticmethod
+    def _merge_recipe_metadata(metadata: Optional[str], recipe_data) -> str:
+        """Merge the recipe marker into existing image metadata"""
+        if metadata:
+            # Remove any existing recipe metadata
+            metadata = ExifUtils.remove_recipe_metadata(metadata)
+        marker = ExifUtils._build_recipe_marker(recipe_data)
+        return f"{metadata} \n {marker}" if metadata else marker
+
     @staticmethod
     def append_recipe_metadata(image_path, recipe_data) -> str:
         """Append recipe metadata to an image's EXIF data"""
         try:
-            # First, extract existing metadata
+            # JPEG fast path: a single piexif.load supplies both the
+            # existing comment and the dict patched back in place, so the
+            # image is never decoded and the EXIF is parsed only once
+            if image_path.lower().endswith(('.jpg', '.jpeg')):
+                exif_dict = ExifUtils._load_exif_dict(image_path)
+                metadata = ExifUtils._decode_user_comment(
+                    exif_dict['Exif'].get(piexif.ExifIFD.UserComment))
+                new_metadata = ExifUtils._merge_recipe_metadata(metadata, recipe_data)
+                exif_dict['Exif'][piexif.ExifIFD.UserComment] = \
+                    b'UNICODE\0' + new_metadata.encode('utf-16be')
+                ExifUtils._insert_exif_dict(image_path, exif_dict)
+                return image_path
+
+            # Other formats: extract existing metadata and merge the
+            # recipe marker in, then write back through PIL
             metadata = ExifUtils.extract_image_metadata(image_path)
-            
-            # Check if there's already recipe metadata
-            if metadata:
-                # Remove any existing recipe metadata
-                metadata = ExifUtils.remove_recipe_metadata(metadata)
-            
-            # Prepare simplified loras data
-            simplified_loras = []
-            for lora in recipe_data.get("loras", []):
-                simplified_lora = {
-                    "file_name": lora.get("file_name", ""),
-                    "hash": lora.get("hash", "").lower() if lora.get("hash") else "",
-                    "strength": float(lora.get("strength", 1.0)),
-                    "modelVersionId": lora.get("modelVersionId", ""),
-                    "modelName": lora.get("modelName", ""),
-                    "modelVersionName": lora.get("modelVersionName", ""),
-                }
-                simplified_loras.append(simplified_lora)            
-            
-            # Create recipe metadata JSON
-            recipe_metadata = {
-                'title': recipe_data.get('title', ''),
-                'base_model': recipe_data.get('base_model', ''),
-                'loras': simplified_loras,
-                'gen_params': recipe_data.get('gen_params', {}),
-                'tags': recipe_data.get('tags', [])
-            }
-            
-            # Convert to JSON string
-            recipe_metadata_json = json.dumps(recipe_metadata)
-            
-            # Create the recipe metadata marker
-            recipe_metadata_marker = f"Recipe metadata: {recipe_metadata_json}"
-            
-            # Append to existing metadata or create new one
-            new_metadata = f"{metadata} \n {recipe_metadata_marker}" if metadata else recipe_metadata_marker
-            
-            # Write back to the image
+            new_metadata = ExifUtils._merge_recipe_metadata(metadata, recipe_data)
             return ExifUtils.update_image_metadata(image_path, new_metadata)
         except Exception as e:
             logger.error(f"Error appending recipe metadata: {e}", exc_info=True)
             return image_path
 
+    @staticmethod
+    def optimize_and_tag(source_path: str, dest_path: str, recipe_data,
+                         target_width=480, quality=85) -> str:
+        """Resize a source image and embed recipe metadata in one pass
+
+        Fuses optimize_image + append_recipe_metadata for the recipe save
+        path: the source is decoded once, its metadata is merged with the
+        recipe marker, and the WebP is encoded and written exactly once
+        instead of being re-opened and rewritten afterwards.
+
+        Args:
+            source_path: Path of the source image
+            dest_path: Destination path for the WebP output
+            recipe_data: Recipe dict to embed as recipe metadata
+
+        Returns:
+            str: The destination path
+        """
+        # Carry over the source metadata with the recipe marker merged in
+        metadata = ExifUtils.extract_image_metadata(source_path)
+        new_metadata = ExifUtils._merge_recipe_metadata(metadata, recipe_data)
+
+        with Image.open(source_path) as img:
+            # Calculate new height to maintain aspect ratio
+            width, height = img.size
+            new_height = int(height * (target_width / width))
+            resized_img = img.resize((target_width, new_height), Image.LANCZOS)
+
+        exif_dict = {'Exif': {piexif.ExifIFD.UserComment: b'UNICODE\0' + new_metadata.encode('utf-16be')}}
+        exif_bytes = piexif.dump(exif_dict)
+        resized_img.save(dest_path, format='WEBP', exif=exif_bytes, quality=quality)
+        return dest_path
+
     @staticmethod
     def remove_recipe_metadata(user_comment):
         """Remove recipe metadata from user comment"""
         if not user_comment:
             return ""
-        
-        # Find the recipe metadata marker
-        recipe_marker_index = user_comment.find("Recipe metadata: ")
-        if recipe_marker_index == -1:
+
+        # Single scan: the pattern covers the optional ", " separator and
+        # everything up to the end of the marker's line
+        match = _RECIPE_MARKER_RE.search(user_comment)
+        if match is None:
             return user_comment
-        
-        # If recipe metadata is not at the start, remove the preceding ", "
-        if recipe_marker_index >= 2 and user_comment[recipe_marker_index-2:recipe_marker_index] == ", ":
-            recipe_marker_index -= 2
-        
-        # Remove the recipe metadata part
-        # First, find where the metadata ends (next line or end of string)
-        next_line_index = user_comment.find("\n", recipe_marker_index)
-        if next_line_index == -1:
+
+        if match.end() == len(user_comment):
             # Metadata is at the end of the string
-            return user_comment[:recipe_marker_index].rstrip()
+            return user_comment[:match.start()].rstrip()
         else:
             # Metadata is in the middle of the string
-            return user_comment[:recipe_marker_index] + user_comment[next_line_index:]
+            return user_comment[:match.start()] + user_comment[match.end():]
             
     @staticmethod
     def optimize_image(image_data, target_width=250, format='webp', quality=85, preserve_metadata=True):
@@ -411,8 +506,8 @@ class ExifUtils:
             # If workflow_data is a string, try to parse it as JSON
             if isinstance(workflow_data, str):
                 try:
-                    workflow_data = json.loads(workflow_data)
-                except json.JSONDecodeError:
+                    workflow_data = json_loads(workflow_data)
+                except ValueError:
                     logger.error("Failed to parse workflow data as JSON")
                     return {}
             
@@ -1,9 +1,13 @@
+import asyncio
 import logging
+import mmap
 import os
 import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
+from .json_utils import json_dumps_bytes
 from .model_utils import determine_base_model
 
 from .lora_metadata import extract_lora_metadata
@@ -11,57 +15,155 @@ from .models import LoraMetadata
 
 logger = logging.getLogger(__name__)
 
-async def calculate_sha256(file_path: str) -> str:
-    """Calculate SHA256 hash of a file"""
+# Above this size, mmap the file for hashing; below it the map setup
+# costs more than it saves
+_MMAP_HASH_THRESHOLD = 64 * 1024 * 1024
+
+def _sha256_sync(file_path: str) -> str:
+    """Synchronous SHA256 body, run in a worker thread
+
+    Large files are mapped and fed to the digest straight from the page
+    cache with no userspace copy. Smaller files pipeline read and hash
+    with two 4 MiB buffers: a single reader thread fills one while this
+    thread digests the other, overlapping disk wait with hash compute.
+    """
     sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
+    current = bytearray(4 << 20)
+    spare = bytearray(4 << 20)
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(os, 'posix_fadvise'):
+            try:
+                # Prime kernel readahead for one sequential pass
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        if os.fstat(f.fileno()).st_size > _MMAP_HASH_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                sha256_hash.update(mapped)
+            return sha256_hash.hexdigest()
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            pending = reader.submit(f.readinto, current)
+            while True:
+                bytes_read = pending.result()
+                if not bytes_read:
+                    break
+                # Start the next read before digesting this buffer
+                pending = reader.submit(f.readinto, spare)
+                sha256_hash.update(memoryview(current)[:bytes_read])
+                current, spare = spare, current
     return sha256_hash.hexdigest()
 
+async def calculate_sha256(file_path: str) -> str:
+    """Calculate SHA256 hash of a file off the event loop
+
+    hashlib releases the GIL while digesting large buffers, so the
+    worker thread genuinely overlaps with the loop instead of stalling
+    every coroutine for the duration of a multi-GB read.
+    """
+    return await asyncio.to_thread(_sha256_sync, file_path)
+
+# Candidate preview suffixes in priority order
+_PREVIEW_EXTENSIONS = (
+    ".preview.png", ".preview.jpg", ".preview.jpeg", ".preview.mp4",
+    ".png", ".jpg", ".jpeg", ".mp4",
+)
+
+# dir_path -> (dir mtime_ns, set of entry names); one scandir serves
+# every lora in a directory during a bulk scan instead of 8 stat calls
+# per file. The directory mtime changes on any add/remove/rename, so a
+# stale listing is detected with a single stat.
+_dir_listing_cache: Dict[str, tuple] = {}
+
+def _list_dir_names(dir_path: str):
+    """Set of entry names in a directory, cached by directory mtime"""
+    try:
+        dir_mtime = os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return ()
+    cached = _dir_listing_cache.get(dir_path)
+    if cached is not None and cached[0] == dir_mtime:
+        return cached[1]
+    try:
+        with os.scandir(dir_path) as it:
+            names = {entry.name for entry in it}
+    except OSError:
+        return ()
+    if len(_dir_listing_cache) > 256:
+        _dir_listing_cache.clear()
+    _dir_listing_cache[dir_path] = (dir_mtime, names)
+    return names
+
 def find_preview_file(base_name: str, dir_path: str) -> str:
     """Find preview file for given base name in directory"""
-    preview_patterns = [
-        f"{base_name}.preview.png",
-        f"{base_name}.preview.jpg",
-        f"{base_name}.preview.jpeg",
-        f"{base_name}.preview.mp4",
-        f"{base_name}.png",
-        f"{base_name}.jpg", 
-        f"{base_name}.jpeg",
-        f"{base_name}.mp4"
-    ]
-    
-    for pattern in preview_patterns:
-        full_pattern = os.path.join(dir_path, pattern)
-        if os.path.exists(full_pattern):
-            return full_pattern.replace(os.sep, "/")
+    names = _list_dir_names(dir_path)
+    for ext in _PREVIEW_EXTENSIONS:
+        candidate = f"{base_name}{ext}"
+        if candidate in names:
+            return os.path.join(dir_path, candidate).replace(os.sep, "/")
     return ""
 
-def normalize_path(path: str) -> str:
-    """Normalize file path to use forward slashes"""
-    return path.replace(os.sep, "/") if path else path
+# Bound once at import: POSIX paths already use forward slashes, so
+# normalization is a no-op there and callers skip the string scan that
+# replace() pays even when nothing matches
+if os.sep == '/':
+    def normalize_path(path: str) -> str:
+        """Normalize file path to use forward slashes"""
+        return path
+else:
+    def normalize_path(path: str) -> str:
+        """Normalize file path to use forward slashes"""
+        return path.replace(os.sep, "/") if path else path
 
-async def get_file_info(file_path: str) -> Optional[LoraMetadata]:
-    """Get basic file information as LoraMetadata object"""
+async def get_file_info(file_path: str, stat_result: Optional[os.stat_result] = None) -> Optional[LoraMetadata]:
+    """Get basic file information as LoraMetadata object
+
+    Args:
+        file_path: Path to the lora file
+        stat_result: Optional stat captured by the directory scan; reused
+            for size/mtime so the file isn't statted again
+    """
     # First check if file actually exists and resolve symlinks
     try:
         real_path = os.path.realpath(file_path)
-        if not os.path.exists(real_path):
-            return None
+        if stat_result is None:
+            # One stat covers the existence check and the size/mtime
+            # reads below, instead of three separate syscalls
+            stat_result = os.stat(real_path)
+    except OSError:
+        return None
     except Exception as e:
         logger.error(f"Error checking file existence for {file_path}: {e}")
         return None
         
     base_name = os.path.splitext(os.path.basename(file_path))[0]
     dir_path = os.path.dirname(file_path)
-    
+
     preview_url = find_preview_file(base_name, dir_path)
-    
+
+    size = stat_result.st_size
+    modified = stat_result.st_mtime
+
+    # Reuse the digest from an existing sidecar when the file itself is
+    # unchanged (same size and mtime) - re-reading the whole file for a
+    # hash is the dominant cost of a rescan
+    sha256 = None
+    metadata_path = f"{os.path.splitext(file_path)[0]}.metadata.json"
+    if os.path.exists(metadata_path):
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing.get('sha256') and existing.get('size') == size \
+                    and existing.get('modified') == modified:
+                sha256 = existing['sha256'].lower()
+                logger.debug(f"Reusing cached SHA256 for unchanged file {file_path}")
+        except Exception as e:
+            logger.debug(f"Could not reuse sidecar hash for {file_path}: {e}")
+
     # Check if a .json file exists with SHA256 hash to avoid recalculation
     json_path = f"{os.path.splitext(file_path)[0]}.json"
-    sha256 = None
-    if os.path.exists(json_path):
+    if not sha256 and os.path.exists(json_path):
         try:
             with open(json_path, 'r', encoding='utf-8') as f:
                 json_data = json.load(f)
@@ -80,8 +182,8 @@ async def get_file_info(file_path: str) -> Optional[LoraMetadata]:
             file_name=base_name,
             model_name=base_name,
             file_path=normalize_path(file_path),
-            size=os.path.getsize(real_path),
-            modified=os.path.getmtime(real_path),
+            size=size,
+            modified=modified,
             sha256=sha256,
             base_model="Unknown",  # Will be updated later
             usage_tips="",
@@ -102,21 +204,35 @@ async def get_file_info(file_path: str) -> Optional[LoraMetadata]:
         logger.error(f"Error getting file info for {file_path}: {e}")
         return None
 
-async def save_metadata(file_path: str, metadata: LoraMetadata) -> None:
-    """Save metadata to .metadata.json file"""
+def _write_json_atomic(path: str, data: Dict) -> None:
+    """Serialize through the fast JSON helper and rename into place
+
+    Writing to a temp file and os.replace-ing it means a crash mid-write
+    can never leave a truncated sidecar behind.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(json_dumps_bytes(data, indent=True))
+    os.replace(tmp_path, path)
+
+def _save_metadata_sync(file_path: str, metadata: LoraMetadata) -> None:
+    """Synchronous save_metadata body, run in a worker thread"""
     metadata_path = f"{os.path.splitext(file_path)[0]}.metadata.json"
     try:
         metadata_dict = metadata.to_dict()
         metadata_dict['file_path'] = normalize_path(metadata_dict['file_path'])
         metadata_dict['preview_url'] = normalize_path(metadata_dict['preview_url'])
-        
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata_dict, f, indent=2, ensure_ascii=False)
+
+        _write_json_atomic(metadata_path, metadata_dict)
     except Exception as e:
         print(f"Error saving metadata to {metadata_path}: {str(e)}")
 
-async def load_metadata(file_path: str) -> Optional[LoraMetadata]:
-    """Load metadata from .metadata.json file"""
+async def save_metadata(file_path: str, metadata: LoraMetadata) -> None:
+    """Save metadata to .metadata.json file without blocking the loop"""
+    await asyncio.to_thread(_save_metadata_sync, file_path, metadata)
+
+def _load_metadata_sync(file_path: str) -> Optional[LoraMetadata]:
+    """Synchronous load_metadata body, run in a worker thread"""
     metadata_path = f"{os.path.splitext(file_path)[0]}.metadata.json"
     try:
         if os.path.exists(metadata_path):
@@ -138,8 +254,15 @@ async def load_metadata(file_path: str) -> Optional[LoraMetadata]:
                     data['file_path'] = normalize_path(file_path)
                     needs_update = True
                 
+                # Check the stored preview against the cached directory
+                # listing instead of a stat per load; during a scan the
+                # whole folder resolves from one scandir
                 preview_url = data.get('preview_url', '')
-                if not preview_url or not os.path.exists(preview_url):
+                preview_exists = (
+                    preview_url
+                    and os.path.basename(preview_url) in _list_dir_names(os.path.dirname(preview_url))
+                )
+                if not preview_exists:
                     base_name = os.path.splitext(os.path.basename(file_path))[0]
                     dir_path = os.path.dirname(file_path)
                     new_preview_url = normalize_path(find_preview_file(base_name, dir_path))
@@ -164,8 +287,7 @@ async def load_metadata(file_path: str) -> Optional[LoraMetadata]:
                     needs_update = True
                 
                 if needs_update:
-                    with open(metadata_path, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
+                    _write_json_atomic(metadata_path, data)
                 
                 return LoraMetadata.from_dict(data)
                 
@@ -173,6 +295,10 @@ async def load_metadata(file_path: str) -> Optional[LoraMetadata]:
         print(f"Error loading metadata from {metadata_path}: {str(e)}")
     return None
 
+async def load_metadata(file_path: str) -> Optional[LoraMetadata]:
+    """Load metadata from .metadata.json file without blocking the loop"""
+    return await asyncio.to_thread(_load_metadata_sync, file_path)
+
 async def update_civitai_metadata(file_path: str, civitai_data: Dict) -> None:
     """Update metadata file with Civitai data"""
     metadata = await load_metadata(file_path)
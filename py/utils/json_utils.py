@@ -0,0 +1,48 @@
+import json
+
+from aiohttp import web
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+if orjson is not None:
+    def json_loads(data):
+        """Parse JSON from str/bytes"""
+        return orjson.loads(data)
+
+    def json_dumps_bytes(obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+else:
+    def json_loads(data):
+        """Parse JSON from str/bytes"""
+        return json.loads(data)
+
+    def json_dumps_bytes(obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes"""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def read_json_file(path: str):
+    """Load a JSON file"""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+
+def write_json_file(path: str, obj):
+    """Write obj to a JSON file with indentation"""
+    with open(path, 'wb') as f:
+        f.write(json_dumps_bytes(obj, indent=True))
+
+
+def json_response(data, status: int = 200, headers: dict = None) -> web.Response:
+    """Build a JSON response using the fast serializer"""
+    return web.Response(
+        body=json_dumps_bytes(data),
+        status=status,
+        content_type='application/json',
+        headers=headers
+    )
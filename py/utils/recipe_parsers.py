@@ -8,6 +8,11 @@ from ..config import config
 
 logger = logging.getLogger(__name__)
 
+# Patterns shared by several parsers, compiled once at import instead of
+# per call on the hot metadata paths
+_PARAM_RE = re.compile(r'([A-Za-z ]+): ([^,]+)')
+_CIVITAI_URN_RE = re.compile(r'civitai:(\d+)@(\d+)')
+
 # Constants for generation parameters
 GEN_PARAM_KEYS = [
     'prompt',
@@ -182,11 +187,11 @@ class RecipeFormatParser(RecipeMetadataParser):
     """Parser for images with dedicated recipe metadata format"""
     
     # Regular expression pattern for extracting recipe metadata
-    METADATA_MARKER = r'Recipe metadata: (\{.*\})'
+    METADATA_MARKER = re.compile(r'Recipe metadata: (\{.*\})', re.IGNORECASE | re.DOTALL)
     
     def is_metadata_matching(self, user_comment: str) -> bool:
         """Check if the user comment matches the metadata format"""
-        return re.search(self.METADATA_MARKER, user_comment, re.IGNORECASE | re.DOTALL) is not None
+        return self.METADATA_MARKER.search(user_comment) is not None
     
     async def parse_metadata(self, user_comment: str, recipe_scanner=None, civitai_client=None) -> Dict[str, Any]:
         """Parse metadata from images with dedicated recipe metadata format"""
@@ -194,7 +199,7 @@ class RecipeFormatParser(RecipeMetadataParser):
             # Extract recipe metadata from user comment
             try:
                 # Look for recipe metadata section
-                recipe_match = re.search(self.METADATA_MARKER, user_comment, re.IGNORECASE | re.DOTALL)
+                recipe_match = self.METADATA_MARKER.search(user_comment)
                 if not recipe_match:
                     recipe_metadata = None
                 else:
@@ -282,11 +287,11 @@ class RecipeFormatParser(RecipeMetadataParser):
 class StandardMetadataParser(RecipeMetadataParser):
     """Parser for images with standard civitai metadata format (prompt, negative prompt, etc.)"""
 
-    METADATA_MARKER = r'Civitai resources: '
+    METADATA_MARKER = re.compile(r'Civitai resources: ', re.IGNORECASE)
 
     def is_metadata_matching(self, user_comment: str) -> bool:
         """Check if the user comment matches the metadata format"""
-        return re.search(self.METADATA_MARKER, user_comment, re.IGNORECASE | re.DOTALL) is not None
+        return self.METADATA_MARKER.search(user_comment) is not None
     
     async def parse_metadata(self, user_comment: str, recipe_scanner=None, civitai_client=None) -> Dict[str, Any]:
         """Parse metadata from images with standard metadata format"""
@@ -373,36 +378,39 @@ class StandardMetadataParser(RecipeMetadataParser):
     def _parse_recipe_metadata(self, user_comment: str) -> Dict[str, Any]:
         """Parse recipe metadata from UserComment"""
         try:
-            # Split by 'Negative prompt:' to get the prompt
-            parts = user_comment.split('Negative prompt:', 1)
-            prompt = parts[0].strip()
-            
+            # Locate the section markers once and slice, instead of
+            # chained split() calls that each rescan and reallocate the
+            # comment (which can be several KB)
+            neg_idx = user_comment.find('Negative prompt:')
+            prompt = user_comment[:neg_idx].strip() if neg_idx != -1 else user_comment.strip()
+
             # Initialize metadata with prompt
             metadata = {"prompt": prompt, "loras": [], "checkpoint": None}
-            
+
             # Extract additional fields if available
-            if len(parts) > 1:
-                negative_and_params = parts[1]
-                
+            if neg_idx != -1:
+                neg_start = neg_idx + len('Negative prompt:')
+
                 # Extract negative prompt
-                if "Steps:" in negative_and_params:
-                    neg_prompt = negative_and_params.split("Steps:", 1)[0].strip()
-                    metadata["negative_prompt"] = neg_prompt
-                
-                # Extract key-value parameters (Steps, Sampler, CFG scale, etc.)
-                param_pattern = r'([A-Za-z ]+): ([^,]+)'
-                params = re.findall(param_pattern, negative_and_params)
-                for key, value in params:
+                steps_idx = user_comment.find('Steps:', neg_start)
+                if steps_idx != -1:
+                    metadata["negative_prompt"] = user_comment[neg_start:steps_idx].strip()
+
+                # Extract key-value parameters (Steps, Sampler, CFG scale,
+                # etc.); pos-based findall avoids slicing the tail out
+                for key, value in _PARAM_RE.findall(user_comment, neg_start):
                     clean_key = key.strip().lower().replace(' ', '_')
                     metadata[clean_key] = value.strip()
             
-            # Extract Civitai resources
-            if 'Civitai resources:' in user_comment:
-                resources_part = user_comment.split('Civitai resources:', 1)[1]
-                if '],' in resources_part:
-                    resources_json = resources_part.split('],', 1)[0] + ']'
+            # Extract Civitai resources by decoding the JSON array in
+            # place; raw_decode finds the array's real end, unlike the
+            # old '],'-split heuristic which broke on nested brackets
+            res_idx = user_comment.find('Civitai resources:')
+            if res_idx != -1:
+                start = user_comment.find('[', res_idx)
+                if start != -1:
                     try:
-                        resources = json.loads(resources_json)
+                        resources, _ = json.JSONDecoder().raw_decode(user_comment, start)
                         # Filter loras and checkpoints
                         for resource in resources:
                             if resource.get('type') == 'lora':
@@ -430,8 +438,8 @@ class A1111MetadataParser(RecipeMetadataParser):
     """Parser for images with A1111 metadata format (Lora hashes)"""
     
     METADATA_MARKER = r'Lora hashes:'
-    LORA_PATTERN = r'<lora:([^:]+):([^>]+)>'
-    LORA_HASH_PATTERN = r'([^:]+): ([a-f0-9]+)'
+    LORA_PATTERN = re.compile(r'<lora:([^:]+):([^>]+)>')
+    LORA_HASH_PATTERN = re.compile(r'([^:]+): ([a-f0-9]+)')
     
     def is_metadata_matching(self, user_comment: str) -> bool:
         """Check if the user comment matches the A1111 metadata format"""
@@ -457,22 +465,21 @@ class A1111MetadataParser(RecipeMetadataParser):
                     metadata["negative_prompt"] = neg_prompt
                 
                 # Extract key-value parameters (Steps, Sampler, CFG scale, etc.)
-                param_pattern = r'([A-Za-z ]+): ([^,]+)'
-                params = re.findall(param_pattern, negative_and_params)
+                params = _PARAM_RE.findall(negative_and_params)
                 for key, value in params:
                     clean_key = key.strip().lower().replace(' ', '_')
                     metadata[clean_key] = value.strip()
             
             # Extract LoRA information from prompt
             lora_weights = {}
-            lora_matches = re.findall(self.LORA_PATTERN, prompt)
+            lora_matches = self.LORA_PATTERN.findall(prompt)
             for lora_name, weights in lora_matches:
                 # Take only the first strength value (before the colon)
                 weight = weights.split(':')[0]
                 lora_weights[lora_name.strip()] = float(weight.strip())
             
             # Remove LoRA patterns from prompt
-            metadata["prompt"] = re.sub(self.LORA_PATTERN, '', prompt).strip()
+            metadata["prompt"] = self.LORA_PATTERN.sub('', prompt).strip()
             
             # Extract LoRA hashes
             lora_hashes = {}
@@ -480,7 +487,7 @@ class A1111MetadataParser(RecipeMetadataParser):
                 lora_hash_section = user_comment.split('Lora hashes:', 1)[1].strip()
                 if lora_hash_section.startswith('"'):
                     lora_hash_section = lora_hash_section[1:].split('"', 1)[0]
-                hash_matches = re.findall(self.LORA_HASH_PATTERN, lora_hash_section)
+                hash_matches = self.LORA_HASH_PATTERN.findall(lora_hash_section)
                 for lora_name, hash_value in hash_matches:
                     # Remove any leading comma and space from lora name
                     clean_name = lora_name.strip().lstrip(',').strip()
@@ -589,7 +596,7 @@ class ComfyMetadataParser(RecipeMetadataParser):
                 
                 # Parse the URN to extract model ID and version ID
                 # Format: "urn:air:sdxl:lora:civitai:1107767@1253442"
-                lora_id_match = re.search(r'civitai:(\d+)@(\d+)', lora_name)
+                lora_id_match = _CIVITAI_URN_RE.search(lora_name)
                 if not lora_id_match:
                     continue
                     
@@ -645,7 +652,7 @@ class ComfyMetadataParser(RecipeMetadataParser):
                 if 'inputs' in checkpoint_node and 'ckpt_name' in checkpoint_node['inputs']:
                     checkpoint_name = checkpoint_node['inputs']['ckpt_name']
                     # Parse checkpoint URN
-                    checkpoint_match = re.search(r'civitai:(\d+)@(\d+)', checkpoint_name)
+                    checkpoint_match = _CIVITAI_URN_RE.search(checkpoint_name)
                     if checkpoint_match:
                         checkpoint_id = checkpoint_match.group(1)
                         checkpoint_version_id = checkpoint_match.group(2)
@@ -760,11 +767,16 @@ class ComfyMetadataParser(RecipeMetadataParser):
 class MetaFormatParser(RecipeMetadataParser):
     """Parser for images with meta format metadata (Lora_N Model hash format)"""
     
-    METADATA_MARKER = r'Lora_\d+ Model hash:'
+    METADATA_MARKER = re.compile(r'Lora_\d+ Model hash:', re.IGNORECASE)
+    META_PARAM_RE = re.compile(r'([A-Za-z_0-9 ]+): ([^,]+)')
+    LORA_BLOCK_RE = re.compile(
+        r'Lora_(\d+) Model name: ([^,]+), Lora_\1 Model hash: ([^,]+), '
+        r'Lora_\1 Strength model: ([^,]+), Lora_\1 Strength clip: ([^,]+)'
+    )
     
     def is_metadata_matching(self, user_comment: str) -> bool:
         """Check if the user comment matches the metadata format"""
-        return re.search(self.METADATA_MARKER, user_comment, re.IGNORECASE | re.DOTALL) is not None
+        return self.METADATA_MARKER.search(user_comment) is not None
     
     async def parse_metadata(self, user_comment: str, recipe_scanner=None, civitai_client=None) -> Dict[str, Any]:
         """Parse metadata from images with meta format metadata"""
@@ -790,16 +802,14 @@ class MetaFormatParser(RecipeMetadataParser):
                     params_section = negative_and_params
                 
                 # Extract key-value parameters (Steps, Sampler, Seed, etc.)
-                param_pattern = r'([A-Za-z_0-9 ]+): ([^,]+)'
-                params = re.findall(param_pattern, params_section)
+                params = self.META_PARAM_RE.findall(params_section)
                 for key, value in params:
                     clean_key = key.strip().lower().replace(' ', '_')
                     metadata[clean_key] = value.strip()
             
             # Extract LoRA information
             # Pattern to match lora entries: Lora_0 Model name: ArtVador I.safetensors, Lora_0 Model hash: 08f7133a58, etc.
-            lora_pattern = r'Lora_(\d+) Model name: ([^,]+), Lora_\1 Model hash: ([^,]+), Lora_\1 Strength model: ([^,]+), Lora_\1 Strength clip: ([^,]+)'
-            lora_matches = re.findall(lora_pattern, user_comment)
+            lora_matches = self.LORA_BLOCK_RE.findall(user_comment)
             
             # If the regular pattern doesn't match, try a more flexible approach
             if not lora_matches:
@@ -923,13 +933,13 @@ class MetaFormatParser(RecipeMetadataParser):
 class ImageSaverMetadataParser(RecipeMetadataParser):
     """Parser for ComfyUI Image Saver plugin metadata format"""
     
-    METADATA_MARKER = r'Hashes: \{"LORA:'
-    LORA_PATTERN = r'<lora:([^:]+):([^>]+)>'
-    HASH_PATTERN = r'Hashes: (\{.*?\})'
+    METADATA_MARKER = re.compile(r'Hashes: \{"LORA:', re.IGNORECASE)
+    LORA_PATTERN = re.compile(r'<lora:([^:]+):([^>]+)>')
+    HASH_PATTERN = re.compile(r'Hashes: (\{.*?\})')
     
     def is_metadata_matching(self, user_comment: str) -> bool:
         """Check if the user comment matches the Image Saver metadata format"""
-        return re.search(self.METADATA_MARKER, user_comment, re.IGNORECASE | re.DOTALL) is not None
+        return self.METADATA_MARKER.search(user_comment) is not None
     
     async def parse_metadata(self, user_comment: str, recipe_scanner=None, civitai_client=None) -> Dict[str, Any]:
         """Parse metadata from Image Saver plugin format"""
@@ -951,24 +961,23 @@ class ImageSaverMetadataParser(RecipeMetadataParser):
                     metadata["negative_prompt"] = neg_prompt
                 
                 # Extract key-value parameters (Steps, Sampler, CFG scale, etc.)
-                param_pattern = r'([A-Za-z ]+): ([^,]+)'
-                params = re.findall(param_pattern, negative_and_params)
+                params = _PARAM_RE.findall(negative_and_params)
                 for key, value in params:
                     clean_key = key.strip().lower().replace(' ', '_')
                     metadata[clean_key] = value.strip()
             
             # Extract LoRA information from prompt
             lora_weights = {}
-            lora_matches = re.findall(self.LORA_PATTERN, prompt)
+            lora_matches = self.LORA_PATTERN.findall(prompt)
             for lora_name, weight in lora_matches:
                 lora_weights[lora_name.strip()] = float(weight.split(':')[0].strip())
             
             # Remove LoRA patterns from prompt
-            metadata["prompt"] = re.sub(self.LORA_PATTERN, '', prompt).strip()
+            metadata["prompt"] = self.LORA_PATTERN.sub('', prompt).strip()
             
             # Extract LoRA hashes from Hashes section
             lora_hashes = {}
-            hash_match = re.search(self.HASH_PATTERN, user_comment)
+            hash_match = self.HASH_PATTERN.search(user_comment)
             if hash_match:
                 try:
                     hashes = json.loads(hash_match.group(1))
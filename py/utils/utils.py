@@ -4,6 +4,12 @@ import tempfile
 import re
 from bs4 import BeautifulSoup
 
+try:
+    # Optional C-accelerated scorer; the difflib path below is the fallback
+    from rapidfuzz import fuzz as _rapidfuzz
+except ImportError:
+    _rapidfuzz = None
+
 def download_twitter_image(url):
     """Download image from a URL containing twitter:image meta tag
     
@@ -79,6 +85,47 @@ def download_civitai_image(url):
         print(f"Error downloading civitai avatar: {e}")
         return None
 
+async def download_civitai_image_async(url, session):
+    """Download a civitai avatar image without blocking the event loop
+
+    Args:
+        url (str): The URL to download image from
+        session (aiohttp.ClientSession): Pooled session for keep-alive reuse
+
+    Returns:
+        str: Path to downloaded temporary image file
+    """
+    try:
+        # Download page content
+        async with session.get(url) as response:
+            response.raise_for_status()
+            html = await response.text()
+
+        # Parse HTML
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Find image with specific class and style attributes
+        image = soup.select_one('img.EdgeImage_image__iH4_q.max-h-full.w-auto.max-w-full')
+
+        if not image or 'src' not in image.attrs:
+            return None
+
+        image_url = image['src']
+
+        # Download image
+        async with session.get(image_url) as image_response:
+            image_response.raise_for_status()
+            image_data = await image_response.read()
+
+        # Save to temp file
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_file:
+            temp_file.write(image_data)
+            return temp_file.name
+
+    except Exception as e:
+        print(f"Error downloading civitai avatar: {e}")
+        return None
+
 def fuzzy_match(text: str, pattern: str, threshold: float = 0.7) -> bool:
         """
         Check if text matches pattern using fuzzy matching.
@@ -103,12 +150,34 @@ def fuzzy_match(text: str, pattern: str, threshold: float = 0.7) -> bool:
             # If not found as substring, try fuzzy matching
             # Check if any part of the text matches this word
             found_match = False
+
+            if _rapidfuzz is not None:
+                # Bit-parallel C scorer; score_cutoff lets it bail early
+                # on pairs that cannot reach the threshold
+                cutoff = threshold * 100
+                for text_part in text.split():
+                    if _rapidfuzz.ratio(text_part, word, score_cutoff=cutoff):
+                        found_match = True
+                        break
+                if not found_match:
+                    return False
+                continue
+
+            word_len = len(word)
             for text_part in text.split():
-                ratio = SequenceMatcher(None, text_part, word).ratio()
-                if ratio >= threshold:
+                # Length bound: ratio can never reach the threshold when
+                # the lengths differ too much, so skip the O(n*m) pass
+                part_len = len(text_part)
+                if 2.0 * min(part_len, word_len) / (part_len + word_len) < threshold:
+                    continue
+                matcher = SequenceMatcher(None, text_part, word)
+                # quick_ratio is a cheap character-multiset upper bound
+                if matcher.quick_ratio() < threshold:
+                    continue
+                if matcher.ratio() >= threshold:
                     found_match = True
                     break
-                
+
             if not found_match:
                 return False
         
@@ -388,8 +388,11 @@ export class ImportManager {
                     imagePreview.innerHTML = `<img src="${e.target.result}" alt="Recipe preview">`;
                 };
                 reader.readAsDataURL(this.recipeImage);
+            } else if (this.recipeData && this.recipeData.image_url) {
+                // For URL mode - the backend serves the analyzed image by URL
+                imagePreview.innerHTML = `<img src="${this.recipeData.image_url}" alt="Recipe preview">`;
             } else if (this.recipeData && this.recipeData.image_base64) {
-                // For URL mode - use the base64 image data returned from the backend
+                // Legacy fallback - base64 image data returned from the backend
                 imagePreview.innerHTML = `<img src="data:image/jpeg;base64,${this.recipeData.image_base64}" alt="Recipe preview">`;
             } else if (this.importMode === 'url') {
                 // Fallback for URL mode if no base64 data
@@ -856,8 +859,11 @@ export class ImportManager {
             if (this.recipeImage) {
                 // File upload mode
                 formData.append('image', this.recipeImage);
+            } else if (this.recipeData && this.recipeData.image_url) {
+                // URL mode - reference the image the backend already downloaded
+                formData.append('image_url', this.recipeData.image_url);
             } else if (this.recipeData && this.recipeData.image_base64) {
-                // URL mode with base64 data
+                // Legacy fallback - URL mode with base64 data
                 formData.append('image_base64', this.recipeData.image_base64);
             } else if (this.importMode === 'url') {
                 // Fallback for URL mode - tell backend to fetch the image again